@@ -6,16 +6,18 @@ import sys
 import tkinter as tk
 from tkinter import messagebox
 import logging
+from src.environment import ensure_environment, env_python
+from src.executor import run_command
+from src.wheelhouse import WheelhouseError
 
-VENV_DIR = ".venv"
 MAX_RETRIES = 3
+COMMAND_TIMEOUT = 1800  # Wall-clock limit for one installation command, in seconds
 
 # Assign complexity scores to dependencies
 DEPENDENCIES = {
     "python3": 1,
     "pip3": 1,
-    "pygame": 2,
-    "pyinstaller": 3,
+    "requirements": 2,  # requirements.txt, including pygame and pyinstaller
 }
 
 # Configure logging
@@ -31,17 +33,17 @@ def check_command(command):
     return shutil.which(command) is not None
 
 def execute_with_retries(command, description, retries=MAX_RETRIES, alternative_method=None):
-    """Execute a command with retry logic and an alternative method if available."""
+    """Execute an argv command with retry logic and an alternative method if available."""
     for attempt in range(retries):
-        try:
-            subprocess.check_call(command, shell=True)
+        result = run_command(command, timeout=COMMAND_TIMEOUT)
+        if result.ok:
             print_status(f"{description} completed successfully.", "✅")
             return True
-        except subprocess.CalledProcessError:
-            print_status(f"❌ {description} failed. Attempt {attempt + 1}/{retries}.", "❌")
-            if attempt == retries - 1 and alternative_method:
-                print_status("Attempting alternative method...", "⚠️")
-                alternative_method()
+        reason = f" (timed out: {result.timed_out})" if result.timed_out else ""
+        print_status(f"❌ {description} failed{reason}. Attempt {attempt + 1}/{retries}.", "❌")
+        if attempt == retries - 1 and alternative_method:
+            print_status("Attempting alternative method...", "⚠️")
+            alternative_method()
         if not alternative_method:
             break
     sys.exit(1)
@@ -54,61 +56,31 @@ def ensure_dependency_installed(dependency, install_command, description, altern
     else:
         print_status(f"{description} already installed.", "✅")
 
-def create_virtual_env():
-    """Create and activate a virtual environment if it doesn't exist."""
-    if not os.path.exists(VENV_DIR):
-        print_status("Creating virtual environment...", "🔧")
-        subprocess.check_call([sys.executable, "-m", "venv", VENV_DIR])
-    
-    activate_script = os.path.join(VENV_DIR, "bin", "activate")
-    if platform.system() == "Windows":
-        activate_script += ".bat"
-    
-    print_status(f"Activating virtual environment: {activate_script}", "🔧")
-    exec(open(activate_script).read(), dict(__file__=activate_script))
-
 def ensure_python_and_pip():
     """Ensure Python3 and pip3 are installed depending on the operating system."""
     system = platform.system()
     
     if system == "Darwin":  # macOS
-        ensure_dependency_installed("python3", "brew install python3", "Python3")
-        ensure_dependency_installed("pip3", "python3 -m ensurepip --upgrade", "pip3")
+        ensure_dependency_installed("python3", ["brew", "install", "python3"], "Python3")
+        ensure_dependency_installed("pip3", ["python3", "-m", "ensurepip", "--upgrade"], "pip3")
     elif system == "Linux":
-        ensure_dependency_installed("python3", "sudo apt install -y python3", "Python3")
-        ensure_dependency_installed("pip3", "sudo apt install -y python3-pip", "pip3")
+        ensure_dependency_installed("python3", ["sudo", "apt-get", "install", "-y", "python3"], "Python3")
+        ensure_dependency_installed("pip3", ["sudo", "apt-get", "install", "-y", "python3-pip"], "pip3")
 
-def install_pygame():
-    """Ensure Pygame is installed."""
-    try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "pygame"])
-        print_status("Pygame installed successfully.", "✅")
-    except subprocess.CalledProcessError as e:
-        print_status("Attempting to bypass 'externally-managed-environment' error...", "⚠️")
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "--break-system-packages", "pygame"])
-            print_status("Pygame installed successfully with --break-system-packages.", "✅")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to install Pygame even with --break-system-packages: {str(e)}")
-            logger.info("💡 Tip: Visit https://www.pygame.org/wiki/GettingStarted for help.")
-            sys.exit(1)
-
-def install_pyinstaller():
-    """Ensure PyInstaller is installed."""
+def install_requirements():
+    """Create or update the managed virtual environment with requirements.txt.
+
+    Nothing runs when the interpreter and requirements.txt are unchanged;
+    otherwise only the changed packages are installed, offline from the
+    wheelhouse once it has been filled.
+    """
     try:
-        subprocess.check_call(
-            [sys.executable, "-m", "pip", "install", "pyinstaller"]
-        )
-        print_status("PyInstaller installed successfully.", "✅")
-    except subprocess.CalledProcessError as e:
-        print_status("Attempting to bypass 'externally-managed-environment' error...", "⚠️")
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "--break-system-packages", "pyinstaller"])
-            print_status("PyInstaller installed successfully with --break-system-packages.", "✅")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to install PyInstaller even with --break-system-packages: {str(e)}")
-            logger.info("💡 Tip: Visit https://www.pyinstaller.org/ for help.")
-            sys.exit(1)
+        python, action = ensure_environment()
+        print_status(f"Virtual environment {action}: {python}", "✅")
+    except (WheelhouseError, OSError) as e:
+        logger.error(f"Failed to set up the virtual environment: {str(e)}")
+        logger.info("💡 Tip: Run the installer once with network access to fill the wheelhouse.")
+        sys.exit(1)
 
 def install_dependencies_in_order():
     """Install all dependencies based on their complexity score."""
@@ -118,17 +90,15 @@ def install_dependencies_in_order():
             ensure_python_and_pip()
         elif dep == "pip3":
             ensure_python_and_pip()  # pip3 is handled with Python
-        elif dep == "pygame":
-            install_pygame()
-        elif dep == "pyinstaller":
-            install_pyinstaller()
+        elif dep == "requirements":
+            install_requirements()
 
 def create_executable():
     """Create the executable using PyInstaller."""
     system = platform.system()
     try:
         subprocess.check_call(
-            ["pyinstaller", "--onefile", "--windowed", "ubuntu_boost.py"]
+            [env_python(), "-m", "PyInstaller", "--onefile", "--windowed", "ubuntu_boost.py"]
         )
         dist_path = os.path.join("dist", "ubuntu_boost")
         if system == "Windows":
@@ -150,8 +120,6 @@ def is_display_available():
 
 def main():
     try:
-        create_virtual_env()
-
         print_status("Checking and installing dependencies...", "🔍")
         install_dependencies_in_order()
 
@@ -3,10 +3,11 @@
 import time
 import sys
 import os
-import subprocess
-import webbrowser
 import logging
 from math import exp
+from src.dependencies import ENV_DIR, normalize_name, verify_requirements
+
+REQUIRED_PACKAGES = {"pygame", "pyinstaller"}  # Missing any of these stops the launch; other pins only warn
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -41,27 +42,30 @@ def clear_screen():
     except Exception as e:
         logger.error(f"⚠️ Error clearing screen: {e}")
 
-# Check if install.py was executed successfully by validating virtual environment and dependencies
+# Check if install.py was executed successfully by validating the virtual environment and requirements.txt pins
 def check_installation():
-    venv_exists = os.path.exists(".venv")
+    venv_exists = os.path.exists(ENV_DIR)
     if not venv_exists:
         logger.error("🚨 Installation not detected! Please run install.py before proceeding.")
         sys.exit(1)
 
     try:
-        result = subprocess.run([sys.executable, "-m", "pip", "freeze"], capture_output=True, text=True, check=True)
-        installed_packages = result.stdout
-        if 'pygame' not in installed_packages:
-            raise Exception("🚨 pygame not found!")
-        if 'pyinstaller' not in installed_packages:
-            raise Exception("🚨 pyinstaller not found!")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"⚠️ Dependency check failed. Please ensure all dependencies are installed.")
-        logger.info("💡 Tip: Run `pip install -r requirements.txt` to install dependencies.")
+        problems = verify_requirements()
+    except OSError as e:
+        logger.error(f"⚠️ Dependency check failed: {e}")
         sys.exit(1)
-    except Exception as e:
-        logger.error(f"⚠️ {str(e)}. Dependencies missing.")
-        logger.info("🔗 Tip: Visit https://pip.pypa.io/en/stable/installation/ for installation help.")
+
+    missing_required = False
+    for name, requirement, installed in problems:
+        if normalize_name(name) in REQUIRED_PACKAGES and installed is None:
+            logger.error(f"🚨 {name} not found!")
+            missing_required = True
+        elif installed is None:
+            logger.warning(f"⚠️ {requirement} is not installed.")
+        else:
+            logger.warning(f"⚠️ {requirement} required, {installed} installed.")
+    if missing_required:
+        logger.info("💡 Tip: Run `pip install -r requirements.txt` to install dependencies.")
         sys.exit(1)
 
 # Show credits with interactive links and additional info for troubleshooting
@@ -87,6 +91,7 @@ def show_credits():
         }
         
         if link_choice in links:
+            import webbrowser  # Only needed here, so it stays off the startup path
             logger.info(f"🌐 Opening {links[link_choice]}")
             webbrowser.open(links[link_choice])
         else:
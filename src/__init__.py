@@ -1,13 +1,16 @@
+import importlib
 import os
-import subprocess
 import sys
 import platform
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Logging is configured in main(): importing any src.* module must stay cheap and side-effect free
 logger = logging.getLogger(__name__)
 
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+ENTRY_POINT_GROUP = "ubuntuboost.optimizers"  # Installed plugins register "<platform.system()> = module:function"
+ISOLATED_ENV = "UBUNTUBOOST_ISOLATED"  # Set to 1 to run Python optimizers in their own interpreter
+
 def validate_script_path(script_path):
     """
     Validate that the script path exists and is a file.
@@ -22,56 +25,141 @@ def validate_script_path(script_path):
         return False
     return True
 
-def execute_script(script_path):
+def run_isolated(argv, name):
+    """
+    Runs argv in a new interpreter or program, streaming its output live.
+    :param argv: The command to run.
+    :param name: What is being run, for log messages.
+    :return: bool - True if it exited successfully, False otherwise.
+    """
+    import subprocess
+
+    try:
+        logger.info(f"⚙️ Attempting to execute: {name}")
+        # stdin/stdout/stderr are inherited, so output appears as it is written and prompts still work
+        subprocess.run(argv, check=True)
+        logger.info(f"✅ {name} executed successfully.")
+        return True
+    except subprocess.CalledProcessError as e:
+        logger.error(f"❌ Failed to execute {name}: exit code {e.returncode}")
+        logger.info("💡 Tip: Ensure the script has the correct permissions and required dependencies.")
+        return False
+    except Exception as e:
+        logger.error(f"❌ An unexpected error occurred while executing {name}: {e}")
+        logger.info("🔧 Troubleshooting: Check if the script path is correct or if there are missing dependencies.")
+        return False
+
+def execute_script(script_path, interpreter=None):
     """
-    Executes a script by its path if it passes validation.
+    Executes a script by its path if it passes validation, streaming its output live.
     :param script_path: The full path to the script file to execute.
+    :param interpreter: Program to run the script with (default: the current Python).
     :return: bool - True if the script executed successfully, False otherwise.
     """
     if validate_script_path(script_path):
+        return run_isolated([interpreter or sys.executable, script_path], os.path.basename(script_path))
+    return False
+
+class PythonOptimizer:
+    """
+    Optimizer backend implemented as a Python callable, run in this interpreter by default.
+    :param target: "module:function", e.g. "src.optimizer:main".
+    :param script_path: File to run instead when isolation is requested; without one,
+        an isolated run imports and calls the target in a new interpreter.
+    """
+    def __init__(self, target, script_path=None):
+        self.target = target
+        self.script_path = script_path
+
+    def split_target(self):
+        module_name, _, function = self.target.partition(":")
+        return module_name, function or "main"
+
+    def load(self):
+        module_name, function = self.split_target()
+        return getattr(importlib.import_module(module_name), function)
+
+    def run(self, isolated=False):
+        if isolated and self.script_path:
+            return execute_script(self.script_path)
+        if isolated:
+            module_name, function = self.split_target()
+            code = f"import importlib; getattr(importlib.import_module({module_name!r}), {function!r})()"
+            return run_isolated([sys.executable, "-c", code], self.target)
+        logger.info(f"⚙️ Running {self.target} in-process")
         try:
-            logger.info(f"⚙️ Attempting to execute: {script_path}")
-            result = subprocess.run([sys.executable, script_path], check=True, capture_output=True, text=True)
-            logger.info(f"✅ {os.path.basename(script_path)} executed successfully.")
-            logger.debug(f"📝 Output:\n{result.stdout}")
-            return True
-        except subprocess.CalledProcessError as e:
-            logger.error(f"❌ Failed to execute {os.path.basename(script_path)}: {e.stderr}")
-            logger.info("💡 Tip: Ensure the script has the correct permissions and required dependencies.")
-            return False
+            self.load()()
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                logger.error(f"❌ {self.target} exited with code {e.code}")
+                return False
         except Exception as e:
-            logger.error(f"❌ An unexpected error occurred while executing {os.path.basename(script_path)}: {e}")
-            logger.info("🔧 Troubleshooting: Check if the script path is correct or if there are missing dependencies.")
+            logger.error(f"❌ {self.target} failed: {e}")
             return False
-    return False
+        logger.info(f"✅ {self.target} completed.")
+        return True
 
-def main():
+class ScriptOptimizer:
+    """
+    Optimizer backend implemented as a script; always runs in its own process.
+    :param script_path: The script to execute.
+    :param interpreter: Program that runs it, e.g. "bash".
+    """
+    def __init__(self, script_path, interpreter):
+        self.script_path = script_path
+        self.interpreter = interpreter
+
+    def run(self, isolated=True):
+        return execute_script(self.script_path, self.interpreter)
+
+# Built-in backends, keyed by platform.system()
+BUILTIN_OPTIMIZERS = {
+    "Linux": PythonOptimizer("src.optimizer:main", os.path.join(SRC_DIR, "optimizer.py")),
+    "Darwin": ScriptOptimizer(os.path.join(SRC_DIR, "MacBoost.sh"), "bash"),
+}
+
+def discover_optimizers():
+    """
+    Return the optimizer backends by platform: the built-in ones, overridden by installed plugins.
+    :return: dict - platform.system() value to backend.
+    """
+    from importlib import metadata
+
+    optimizers = dict(BUILTIN_OPTIMIZERS)
+    try:
+        entry_points = metadata.entry_points(group=ENTRY_POINT_GROUP)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not read optimizer plugins: {e}")
+        entry_points = ()
+    for entry_point in entry_points:
+        optimizers[entry_point.name] = PythonOptimizer(entry_point.value)
+    return optimizers
+
+def main(isolated=None):
     """
     Main function to manage the execution of optimizers based on the OS.
-    It selects the correct script depending on the user's operating system.
+    It selects the registered backend for the user's operating system and runs it
+    in-process, or in a separate interpreter if isolation is requested.
+    :param isolated: Run Python optimizers in a subprocess (default: the UBUNTUBOOST_ISOLATED variable).
     """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     system = platform.system()
     logger.info(f"📋 Detected OS: {system}")
+    if isolated is None:
+        isolated = os.environ.get(ISOLATED_ENV) == "1"
 
-    if system == "Linux":
-        logger.info("🐧 Detected Linux (Ubuntu) system.")
-        script = "Optimizer.py"
-    elif system == "Darwin":
-        logger.info("🍎 Detected macOS system.")
-        script = "MacBoost.sh"
-    else:
+    optimizer = discover_optimizers().get(system)
+    if optimizer is None:
         logger.error(f"⚠️ Unsupported operating system: {system}. This script only supports Linux (Ubuntu) and macOS.")
         sys.exit(1)
 
-    script_path = os.path.join("src", script)
-    success = execute_script(script_path)
+    success = optimizer.run(isolated=isolated)
 
     if not success:
-        logger.error(f"⚠️ Script execution failed: {script_path}")
+        logger.error(f"⚠️ Optimizer execution failed on {system}")
         logger.info("🔗 Tip: Visit https://support.com/troubleshooting for more help with script execution.")
 
     logger.info("🎉 Script execution management completed.")
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Collect apt intents from several optimizer tasks and run them as few transactions."""
+try:
+    from .dpkg import DPKG_STATUS, load_status
+except ImportError:
+    from dpkg import DPKG_STATUS, load_status
+
+# sudo resets the environment, so the frontend is set through env(1) after it.
+# Conffile questions keep the locally modified file, or take the default if unmodified.
+APT_GET = ["env", "DEBIAN_FRONTEND=noninteractive", "apt-get", "-y", "-q",
+           "-o", "Dpkg::Options::=--force-confdef", "-o", "Dpkg::Options::=--force-confold"]
+
+
+class AptPlan:
+    """Accumulate update, upgrade, install, purge and autoremove requests.
+
+    ``transactions()`` folds them into at most three apt-get invocations: a
+    package list refresh, an upgrade, and one install/purge/autoremove
+    transaction (apt-get accepts ``pkg_`` to purge inside ``install``).
+    """
+
+    def __init__(self):
+        self.refresh = False
+        self.upgrade_mode = None
+        self.installs = {}
+        self.purges = set()
+        self.autoremove_mode = None
+
+    def update(self):
+        """Request a package list refresh."""
+        self.refresh = True
+
+    def upgrade(self, full=False):
+        """Request an upgrade; a full upgrade supersedes a plain one."""
+        if full or self.upgrade_mode is None:
+            self.upgrade_mode = "full-upgrade" if full else self.upgrade_mode or "upgrade"
+
+    def install(self, *packages, version=None):
+        """Request packages, optionally pinned to ``version``."""
+        for package in packages:
+            self.installs[package] = version or self.installs.get(package)
+            self.purges.discard(package)
+
+    def purge(self, *packages):
+        """Request packages to be purged."""
+        for package in packages:
+            if package not in self.installs:
+                self.purges.add(package)
+
+    def autoremove(self, purge=False):
+        """Request removal of unused packages, purging their configuration if asked."""
+        if purge or self.autoremove_mode is None:
+            self.autoremove_mode = "purge" if purge else self.autoremove_mode or "remove"
+
+    def pending_installs(self, installed):
+        """Return install specs not already satisfied by ``installed`` (``{package: version}``)."""
+        pending = []
+        for package, version in sorted(self.installs.items()):
+            current = installed.get(package)
+            if current is None or (version and current != version):
+                pending.append(f"{package}={version}" if version else package)
+        return pending
+
+    def transactions(self, status_path=DPKG_STATUS):
+        """Return ``(label, argv)`` pairs for the apt-get runs this plan needs."""
+        try:
+            index = load_status(status_path)
+        except OSError:
+            index = None
+        installed = index.installed_versions() if index else {}
+        present = {package.name for package in index.packages if package.state != "not-installed"} if index else set()
+
+        transactions = []
+        if self.refresh:
+            transactions.append(("Package list update", APT_GET + ["update"]))
+        if self.upgrade_mode:
+            transactions.append(("System upgrade", APT_GET + [self.upgrade_mode]))
+
+        packages = self.pending_installs(installed)
+        purges = [f"{package}_" for package in sorted(self.purges) if package in present]
+        packages += purges
+        if packages:
+            argv = APT_GET + ["install"]
+            if self.autoremove_mode:
+                argv.append("--autoremove")
+            # Without --purge, "name_" only removes, which leaves config-files packages as they are
+            if purges or self.autoremove_mode == "purge":
+                argv.append("--purge")
+            transactions.append(("Package transaction", argv + packages))
+        elif self.autoremove_mode:
+            argv = APT_GET + ["autoremove"]
+            if self.autoremove_mode == "purge":
+                argv.append("--purge")
+            transactions.append(("Unused package removal", argv))
+        return transactions
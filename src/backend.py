@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Side-effect backends for optimizer tasks: the real system, or a recorder for dry runs."""
+import json
+import os
+import shutil
+import sys
+import threading
+
+try:
+    from .executor import CommandResult, null_sink, run_command
+    from .profiles import ProfileEngine, ProfileError
+except ImportError:
+    from executor import CommandResult, null_sink, run_command
+    from profiles import ProfileEngine, ProfileError
+
+PROFILES_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles.py")
+
+
+class LocalBackend:
+    """Apply every operation to this machine.
+
+    ``sink`` receives each ``(stream, line)`` of command output; None prints it.
+    """
+
+    dry_run = False
+
+    def __init__(self, sink=None):
+        self.sink = sink
+
+    def run(self, argv, **kwargs):
+        if self.sink:
+            kwargs.setdefault("sink", self.sink)
+        return run_command(argv, **kwargs)
+
+    def write_file(self, path, content):
+        with open(path, "w") as f:
+            f.write(content)
+
+    def copy(self, src, dst):
+        shutil.copy(src, dst)
+
+    def move(self, src, dst):
+        shutil.move(src, dst)
+
+    def remove_tree(self, path):
+        shutil.rmtree(path)
+
+    def apply_profile(self, profile, persist=False):
+        if os.geteuid() == 0:
+            return ProfileEngine().apply(profile, persist=persist)
+        reply = self._profile_as_root("apply", json.dumps(profile), *(["--persist"] if persist else []))
+        return reply["settings"], reply["skipped"]
+
+    def rollback_profile(self):
+        if os.geteuid() == 0:
+            return ProfileEngine().rollback()
+        return self._profile_as_root("rollback")["restored"]
+
+    def _profile_as_root(self, *args):
+        """Run the profile engine through sudo, for callers that cannot write /proc/sys themselves."""
+        result = run_command(["sudo", sys.executable, PROFILES_SCRIPT, *args], sink=null_sink)
+        try:
+            reply = json.loads(result.stdout[-1])
+        except (IndexError, ValueError):
+            details = result.stderr[-1] if result.stderr else f"exit code {result.returncode}"
+            raise ProfileError(f"Could not run the profile engine as root: {details}")
+        if "error" in reply:
+            raise ProfileError(reply["error"])
+        return reply
+
+    def note_apt_plan(self, plan):
+        """Hook for backends that want to inspect planned apt work; nothing to do locally."""
+
+
+class RecordingBackend:
+    """Record what each task would do without touching the system.
+
+    Commands report success with no output, so tasks follow their normal
+    success path. ``task`` labels the operations recorded from now on.
+    """
+
+    dry_run = True
+
+    def __init__(self):
+        self.operations = []
+        self.apt_plans = []
+        self.task = None
+        self._lock = threading.Lock()
+
+    def _record(self, kind, **details):
+        with self._lock:
+            self.operations.append(dict(task=self.task, kind=kind, **details))
+
+    def run(self, argv, **kwargs):
+        self._record("command", argv=list(argv))
+        return CommandResult(list(argv), 0, [], [], 0.0)
+
+    def write_file(self, path, content):
+        self._record("write", path=path, bytes=len(content.encode()))
+
+    def copy(self, src, dst):
+        self._record("copy", src=src, dst=dst)
+
+    def move(self, src, dst):
+        self._record("move", src=src, dst=dst)
+
+    def remove_tree(self, path):
+        self._record("remove", path=path)
+
+    def apply_profile(self, profile, persist=False):
+        engine = ProfileEngine()
+        settings, skipped = engine.settings(profile)
+        try:
+            current = engine.snapshot(settings)["values"]
+        except OSError:
+            current = {}
+        for path, value in settings.items():
+            self._record("setting", path=path, old=current.get(path), new=value)
+        return settings, skipped
+
+    def rollback_profile(self):
+        self._record("rollback")
+        return True
+
+    def note_apt_plan(self, plan):
+        self.apt_plans.append(plan)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Repeatable micro benchmarks run before and after tuning steps."""
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+try:
+    from .lazy import lazy_import
+except ImportError:
+    from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+REPEATS = 15                         # Measured iterations per benchmark
+WARMUP = 2                           # Discarded iterations per benchmark
+BOOTSTRAP_SAMPLES = 2000             # Resamples for the median confidence interval
+CONFIDENCE = 0.95
+BENCHMARK_DIR = "benchmarks"         # Where JSON reports are written
+
+CPU_LOOP_SIZE = 200_000
+MEMORY_BYTES = 64 * 1024 * 1024
+PAGE_CACHE_BYTES = 32 * 1024 * 1024
+FSYNC_BYTES = 4096
+
+# Buffers for bench_memory, allocated once so the copy is what gets timed.
+_memory_buffers = {}
+
+
+# Benchmarks: each returns the seconds one iteration took (lower is better).
+def bench_cpu(workdir):
+    """Tight integer loop in the interpreter."""
+    start = time.perf_counter()
+    total = 0
+    for i in range(CPU_LOOP_SIZE):
+        total += i * i
+    return time.perf_counter() - start
+
+
+def bench_memory(workdir):
+    """Copy a 64 MiB buffer."""
+    if "src" not in _memory_buffers:
+        _memory_buffers["src"] = np.ones(MEMORY_BYTES // 8)
+        _memory_buffers["dst"] = np.empty_like(_memory_buffers["src"])
+    start = time.perf_counter()
+    np.copyto(_memory_buffers["dst"], _memory_buffers["src"])
+    return time.perf_counter() - start
+
+
+def bench_page_cache(workdir):
+    """Read a 32 MiB file that is already in the page cache."""
+    path = os.path.join(workdir, "page_cache.bin")
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(os.urandom(PAGE_CACHE_BYTES))
+        with open(path, "rb") as f:
+            while f.read(1024 * 1024):
+                pass
+    start = time.perf_counter()
+    with open(path, "rb", buffering=0) as f:
+        while f.read(1024 * 1024):
+            pass
+    return time.perf_counter() - start
+
+
+def bench_fork_exec(workdir):
+    """Spawn and reap a trivial process."""
+    start = time.perf_counter()
+    subprocess.run(["true"], check=False)
+    return time.perf_counter() - start
+
+
+def bench_fsync(workdir):
+    """Write 4 KiB and fsync it."""
+    path = os.path.join(workdir, "fsync.bin")
+    data = b"\0" * FSYNC_BYTES
+    start = time.perf_counter()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return time.perf_counter() - start
+
+
+BENCHMARKS = {
+    "cpu_loop": bench_cpu,
+    "memory_copy": bench_memory,
+    "page_cache_read": bench_page_cache,
+    "fork_exec": bench_fork_exec,
+    "fsync": bench_fsync,
+}
+
+
+# Statistics
+def summarize(samples, rng=None):
+    """Return median, quartiles, IQR and a bootstrap confidence interval of the median."""
+    data = np.asarray(samples, dtype=np.float64)
+    rng = rng or np.random.default_rng(0)
+    q1, median, q3 = np.percentile(data, [25, 50, 75])
+    medians = np.median(rng.choice(data, size=(BOOTSTRAP_SAMPLES, len(data))), axis=1)
+    alpha = (1 - CONFIDENCE) / 2
+    ci_low, ci_high = np.percentile(medians, [100 * alpha, 100 * (1 - alpha)])
+    return {
+        "n": int(len(data)),
+        "median": float(median),
+        "q1": float(q1),
+        "q3": float(q3),
+        "iqr": float(q3 - q1),
+        "ci_low": float(ci_low),
+        "ci_high": float(ci_high),
+    }
+
+
+def compare(before, after):
+    """Compare two suite results; a change counts as significant when the median CIs do not overlap."""
+    comparison = {}
+    for name in before:
+        if name not in after:
+            continue
+        b, a = before[name], after[name]
+        comparison[name] = {
+            "before_median": b["median"],
+            "after_median": a["median"],
+            "change_pct": 100.0 * (a["median"] - b["median"]) / b["median"] if b["median"] else 0.0,
+            "significant": a["ci_high"] < b["ci_low"] or a["ci_low"] > b["ci_high"],
+        }
+    return comparison
+
+
+# Running
+def run_suite(names=None, repeats=REPEATS, warmup=WARMUP):
+    """Run the selected benchmarks and return ``{name: summary}``."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="ubuntuboost-bench-") as workdir:
+        for name in names or BENCHMARKS:
+            bench = BENCHMARKS[name]
+            for _ in range(warmup):
+                bench(workdir)
+            results[name] = summarize([bench(workdir) for _ in range(repeats)])
+    return results
+
+
+def host_info():
+    """Identify the host and release the numbers were measured on."""
+    return {
+        "host": platform.node(),
+        "kernel": platform.release(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+    }
+
+
+def benchmark_step(label, action, names=None, repeats=REPEATS):
+    """Run the suite, then ``action()``, then the suite again; return the step record."""
+    before = run_suite(names, repeats)
+    success = action() is not False
+    after = run_suite(names, repeats)
+    return {
+        "step": label,
+        "success": success,
+        "before": before,
+        "after": after,
+        "comparison": compare(before, after),
+    }
+
+
+def save_report(steps, directory=BENCHMARK_DIR, extra=None):
+    """Write a JSON report for ``steps`` and return its path."""
+    os.makedirs(directory, exist_ok=True)
+    report = dict(host_info(), timestamp=time.strftime("%Y-%m-%dT%H:%M:%S%z"), steps=steps, **(extra or {}))
+    path = os.path.join(directory, f"{report['host']}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
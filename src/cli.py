@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Headless UbuntuBoost CLI: no prompts, no animations, JSON-lines events on stdout, meaningful exit codes.
+
+Every line on stdout is one JSON object with at least ``ts`` and ``event``:
+``start``, ``task_start``, ``log``, ``output`` (command output lines),
+``task_end``, ``plan`` and finally ``end`` with the exit code. Anything a
+task prints directly is sent to stderr so stdout stays machine-readable.
+"""
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+import click
+
+try:
+    from . import optimizer
+    from .backend import LocalBackend
+    from .profiles import PROFILES
+except ImportError:
+    import optimizer
+    from backend import LocalBackend
+    from profiles import PROFILES
+
+EXIT_OK = 0
+EXIT_FAILED = 1            # A task ran and failed
+EXIT_USAGE = 2             # Bad arguments (click's own code)
+EXIT_NOT_CONFIRMED = 3     # The command changes the system and --yes was not given
+EXIT_UNSUPPORTED = 4       # Not Ubuntu, or not running as root
+EXIT_INTERRUPTED = 130
+
+
+class EventWriter:
+    """Write JSON-lines events to one stream, safely from the optimizer's worker threads."""
+
+    def __init__(self, stream, command_output=True):
+        self.stream = stream
+        self.command_output = command_output
+        self.local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def task(self):
+        return getattr(self.local, "task", None)
+
+    def emit(self, event, **fields):
+        record = {"ts": round(time.time(), 3), "event": event, **fields}
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def log(self, level, message):
+        self.emit("log", task=self.task, level=level, message=message)
+
+    def output(self, stream, line):
+        if self.command_output:
+            self.emit("output", task=self.task, stream=stream, line=line)
+
+    def run_task(self, name, action):
+        """Run one optimizer task between task_start/task_end events; return its success."""
+        self.local.task = name
+        self.emit("task_start", task=name)
+        started = time.perf_counter()
+        try:
+            ok = action() is not False
+        except Exception as e:
+            self.emit("log", task=name, level="error", message=f"{type(e).__name__}: {e}")
+            ok = False
+        self.emit("task_end", task=name, ok=ok, duration=round(time.perf_counter() - started, 3))
+        self.local.task = None
+        return ok
+
+
+def _check_host():
+    if not optimizer.is_ubuntu():
+        return "This command only runs on Ubuntu."
+    if os.geteuid() != 0:
+        return "This command must run as root."
+    return None
+
+
+def _execute(ctx, command, changes_system, body):
+    """Shared driver: checks, event stream setup, running ``body(events)`` and the final exit code."""
+    options = ctx.obj
+    events = EventWriter(sys.stdout, command_output=options["command_output"])
+    started = time.perf_counter()
+    events.emit("start", command=command, pid=os.getpid())
+
+    def finish(code, **fields):
+        events.emit("end", command=command, exit_code=code, duration=round(time.perf_counter() - started, 3), **fields)
+        ctx.exit(code)
+
+    if changes_system and not options["yes"]:
+        events.emit("log", level="error", message=f"'{command}' changes the system; pass --yes to confirm.")
+        finish(EXIT_NOT_CONFIRMED)
+    problem = _check_host() if changes_system else None
+    if problem:
+        events.emit("log", level="error", message=problem)
+        finish(EXIT_UNSUPPORTED)
+
+    optimizer.log_handler = events.log
+    optimizer.backend = LocalBackend(sink=events.output)
+    optimizer.PROBE_MIRRORS = options["probe_mirrors"]
+    optimizer.MIRROR_BASE_URL = options["mirror_base_url"]
+    if changes_system:
+        optimizer.metrics_sampler.start()
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            ok = body(events)
+    except KeyboardInterrupt:
+        finish(EXIT_INTERRUPTED)
+    except Exception as e:
+        events.emit("log", level="error", message=f"{type(e).__name__}: {e}")
+        ok = False
+    finally:
+        optimizer.metrics_sampler.stop()
+        optimizer.log_handler = None
+    finish(EXIT_OK if ok else EXIT_FAILED)
+
+
+YES_HELP = "Confirm commands that change the system."
+COMMAND_OUTPUT_HELP = "Emit an 'output' event for every line commands print."
+PROBE_MIRRORS_HELP = "Check that every sources.list.d mirror answers when package sources are validated."
+MIRROR_BASE_URL_HELP = "Send mirror probes to this server instead of the real mirrors."
+
+
+@click.group()
+@click.option("--yes", "-y", is_flag=True, help=YES_HELP)
+@click.option("--command-output/--no-command-output", default=True, help=COMMAND_OUTPUT_HELP)
+@click.option("--probe-mirrors", is_flag=True, help=PROBE_MIRRORS_HELP)
+@click.option("--mirror-base-url", metavar="URL", help=MIRROR_BASE_URL_HELP)
+@click.pass_context
+def cli(ctx, yes, command_output, probe_mirrors, mirror_base_url):
+    """Run UbuntuBoost optimizer tasks without prompts, for automation."""
+    ctx.obj = {"yes": yes, "command_output": command_output, "probe_mirrors": probe_mirrors,
+               "mirror_base_url": mirror_base_url}
+
+
+def _set_yes(ctx, param, value):
+    if value:
+        ctx.obj["yes"] = True
+
+
+def _set_command_output(ctx, param, value):
+    if value is not None:
+        ctx.obj["command_output"] = value
+
+
+def _set_probe_mirrors(ctx, param, value):
+    if value:
+        ctx.obj["probe_mirrors"] = True
+
+
+def _set_mirror_base_url(ctx, param, value):
+    if value is not None:
+        ctx.obj["mirror_base_url"] = value
+
+
+def common_options(command):
+    """Accept the group's options after the subcommand too: ``cli update --yes`` works like ``cli --yes update``."""
+    command = click.option("--mirror-base-url", metavar="URL", expose_value=False,
+                           callback=_set_mirror_base_url, help=MIRROR_BASE_URL_HELP)(command)
+    command = click.option("--probe-mirrors", is_flag=True, expose_value=False,
+                           callback=_set_probe_mirrors, help=PROBE_MIRRORS_HELP)(command)
+    command = click.option("--command-output/--no-command-output", default=None, expose_value=False,
+                           callback=_set_command_output, help=COMMAND_OUTPUT_HELP)(command)
+    return click.option("--yes", "-y", is_flag=True, expose_value=False, callback=_set_yes, help=YES_HELP)(command)
+
+
+def _task_command(name, action, help_text):
+    @cli.command(name, help=help_text)
+    @common_options
+    @click.pass_context
+    def command(ctx):
+        _execute(ctx, name, True, lambda events: events.run_task(name, action))
+    return command
+
+
+for _name, _action, _help in (
+    ("update", optimizer.update_system, "Update package lists and upgrade the system."),
+    ("install-packages", optimizer.install_system_packages, "Install the packages the optimizer relies on."),
+    ("clean-kernels", optimizer.clean_old_kernels, "Purge old kernels and unused packages."),
+    ("optimize", optimizer.optimize_system, "Set the CPU governor and enable thermald and TLP."),
+    ("security", optimizer.enhance_security, "Enable UFW with deny-incoming, allow-outgoing and SSH."),
+    ("swap", optimizer.configure_swap, "Tune swappiness and VFS cache pressure."),
+    ("clean", optimizer.clean_system, "Remove packages that are no longer needed."),
+    ("benchmark", optimizer.benchmark_tuning_steps, "Benchmark the system around each tuning step."),
+    ("profile-rollback", optimizer.rollback_profile, "Restore the settings saved before the first profile; succeeds if none was applied."),
+):
+    _task_command(_name, _action, _help)
+
+
+@cli.command("profile-apply")
+@common_options
+@click.argument("profile", type=click.Choice(list(PROFILES)))
+@click.pass_context
+def profile_apply(ctx, profile):
+    """Apply, verify and persist a workload tuning profile."""
+    action = lambda: optimizer.apply_tuning(profile, f"Profile {profile} applied and persisted.",
+                                            f"Failed to apply profile {profile}.", persist=True)
+    _execute(ctx, "profile-apply", True, lambda events: events.run_task(f"profile:{profile}", action))
+
+
+@cli.command("full")
+@common_options
+@click.option("--workers", type=click.IntRange(1), default=optimizer.MAX_WORKERS, show_default=True,
+              help="Independent tasks run at the same time.")
+@click.pass_context
+def full(ctx, workers):
+    """Run every task, independent ones concurrently, with one task_start/task_end pair per task."""
+    def body(events):
+        graph = optimizer.build_full_optimization_graph()
+        for name, task in graph.tasks.items():
+            task.action = lambda name=name, action=task.action: events.run_task(name, action)
+        results = graph.run(max_workers=workers)
+        optimizer.record_timings(results)
+        path, total = graph.critical_path(results)
+        events.emit("schedule", critical_path=path, duration=round(total, 3))
+        return all(result.success for result in results.values())
+    _execute(ctx, "full", True, body)
+
+
+@cli.command("plan")
+@common_options
+@click.pass_context
+def plan(ctx):
+    """Report what 'full' would change and its estimated cost, without changing anything."""
+    def body(events):
+        events.emit("plan", **optimizer.build_plan())
+        return True
+    _execute(ctx, "plan", False, body)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Check requirements.txt against the installed distributions in-process, without pip."""
+import hashlib
+import json
+import os
+import re
+import sys
+
+REQUIREMENTS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "requirements.txt")
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "ubuntuboost", "dependencies.json")
+ENV_DIR = os.path.join(os.path.dirname(REQUIREMENTS_FILE), ".venv")   # The managed environment (see environment.py)
+
+_REQUIREMENT = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*((?:[<>=!~]=?|===)\s*[^\s;,]+)?")
+
+
+class Requirement:
+    """One line of requirements.txt: a name and an optional ``op version`` constraint."""
+
+    def __init__(self, name, op=None, version=None):
+        self.name = name
+        self.key = normalize_name(name)
+        self.op = op
+        self.version = version
+
+    def __str__(self):
+        return f"{self.name}{self.op}{self.version}" if self.op else self.name
+
+    def satisfied_by(self, installed):
+        """Return True if ``installed`` (a version string) meets the constraint."""
+        if not self.op:
+            return True
+        if self.op in ("==", "==="):
+            return _version_key(installed) == _version_key(self.version)
+        if self.op == "~=":
+            # The prefix comes from the release as written: ~=2.0 pins 2.*, ~=1.4.0 pins 1.4.*
+            release = _version_key(self.version, strip_zeros=False)[:-1]
+            return (_version_key(installed) >= _version_key(self.version)
+                    and _version_key(installed, strip_zeros=False)[:len(release)] == release)
+        a, b = _version_key(installed), _version_key(self.version)
+        return {"!=": a != b, ">=": a >= b, "<=": a <= b, ">": a > b, "<": a < b}[self.op]
+
+
+def normalize_name(name):
+    """PEP 503 name normalization: ``PyYAML`` and ``pyyaml``, ``tlp_rdw`` and ``tlp-rdw`` are the same project."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _version_key(version, strip_zeros=True):
+    """Comparable key for release versions (``1.14.2`` -> ``(1, 14, 2)``), ignoring trailing zeros by default."""
+    parts = [int(part) if part.isdigit() else part for part in re.split(r"[.+-]", version)]
+    while strip_zeros and len(parts) > 1 and parts[-1] == 0:
+        parts.pop()
+    return tuple((0, part) if isinstance(part, int) else (-1, part) for part in parts)
+
+
+def parse_requirements(path=REQUIREMENTS_FILE):
+    """Return the ``Requirement`` of each line, skipping comments, options and environment markers."""
+    requirements = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line or line.startswith("-"):
+                continue
+            match = _REQUIREMENT.match(line)
+            if not match:
+                continue
+            name, constraint = match.groups()
+            op = version = None
+            if constraint:
+                op = re.match(r"===|[<>=!~]=?", constraint).group(0)
+                version = constraint[len(op):].strip()
+            requirements.append(Requirement(name, op, version))
+    return requirements
+
+
+def installed_distributions(path=None):
+    """Return ``{normalized name: version}`` for every distribution importable from ``path`` (sys.path)."""
+    from importlib import metadata  # Only needed on a cache miss, and slow to import
+
+    installed = {}
+    for dist in metadata.distributions(path=path if path is not None else sys.path):
+        name = dist.metadata["Name"]
+        if name:
+            # The first entry on the path wins, as it would for an import
+            installed.setdefault(normalize_name(name), dist.version)
+    return installed
+
+
+def check_requirements(requirements, installed=None):
+    """Return ``[(requirement, installed version or None)]`` for each requirement that is not met."""
+    installed = installed_distributions() if installed is None else installed
+    problems = []
+    for requirement in requirements:
+        version = installed.get(requirement.key)
+        if version is None or not requirement.satisfied_by(version):
+            problems.append((requirement, version))
+    return problems
+
+
+def environment_fingerprint(requirements_path=REQUIREMENTS_FILE, path=None):
+    """Hash the interpreter, requirements.txt and the distributions installed on the path.
+
+    Only directory listings are read: installing, upgrading or removing a
+    package always adds or renames a ``*.dist-info`` or ``*.egg-info`` entry.
+    """
+    digest = hashlib.sha256()
+    digest.update(sys.version.encode())
+    digest.update(sys.prefix.encode())
+    with open(requirements_path, "rb") as f:
+        digest.update(f.read())
+    for entry in path if path is not None else sys.path:
+        try:
+            names = sorted(item.name for item in os.scandir(entry or ".")
+                           if item.name.endswith((".dist-info", ".egg-info")))
+        except OSError:
+            continue
+        digest.update(entry.encode())
+        digest.update("\0".join(names).encode())
+    return digest.hexdigest()
+
+
+def verify_requirements(requirements_path=REQUIREMENTS_FILE, cache_file=CACHE_FILE):
+    """Check requirements_path against this environment; return ``[(name, requirement, installed)]`` unmet.
+
+    ``requirement`` is the line as a string and ``installed`` the version
+    found, or None. The result is cached under the environment fingerprint, so an unchanged
+    environment is verified without reading any package metadata.
+    """
+    fingerprint = environment_fingerprint(requirements_path)
+    try:
+        with open(cache_file) as f:
+            cached = json.load(f)
+        if cached.get("fingerprint") == fingerprint:
+            return [tuple(problem) for problem in cached["problems"]]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    problems = [(requirement.name, str(requirement), version)
+                for requirement, version in check_requirements(parse_requirements(requirements_path))]
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp = f"{cache_file}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"fingerprint": fingerprint, "problems": problems}, f)
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
+    return problems
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Read the dpkg package database and os-release without spawning dpkg, apt or lsb_release."""
+import bisect
+import mmap
+import os
+import re
+
+DPKG_STATUS = "/var/lib/dpkg/status"
+OS_RELEASE = "/etc/os-release"
+
+# Parsed files keyed by path, reused while (mtime, size) stays the same.
+_cache = {}
+
+_KERNEL_IMAGE = re.compile(r"^linux-image-(?:unsigned-)?(\d+\.\d+\.\d+-\d+.*)$")
+_KERNEL_ABI = re.compile(r"^(\d+\.\d+\.\d+-\d+)")
+
+
+class Package:
+    """One stanza of the dpkg status file."""
+
+    __slots__ = ("name", "version", "architecture", "want", "state", "fields")
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.name = fields.get("Package", "")
+        self.version = fields.get("Version")
+        self.architecture = fields.get("Architecture")
+        status = fields.get("Status", "").split()
+        self.want = status[0] if status else None
+        self.state = status[-1] if status else "not-installed"
+
+    @property
+    def installed(self):
+        return self.state == "installed"
+
+    def __repr__(self):
+        return f"Package({self.name}={self.version}, {self.state})"
+
+
+class StatusIndex:
+    """Indexed view of the dpkg status file."""
+
+    def __init__(self, packages):
+        self.packages = list(packages)
+        self._by_name = {}
+        self._by_state = {}
+        self._by_version = {}
+        for package in self.packages:
+            self._by_name.setdefault(package.name, []).append(package)
+            self._by_state.setdefault(package.state, []).append(package)
+            self._by_version.setdefault(package.version, []).append(package)
+        self._names = sorted(self._by_name)
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def get(self, name):
+        """Return every architecture of ``name`` known to dpkg."""
+        return list(self._by_name.get(name, ()))
+
+    def by_state(self, state):
+        """Return packages in a dpkg state such as ``installed`` or ``config-files``."""
+        return list(self._by_state.get(state, ()))
+
+    def by_prefix(self, prefix):
+        """Return packages whose name starts with ``prefix``."""
+        start = bisect.bisect_left(self._names, prefix)
+        matches = []
+        for name in self._names[start:]:
+            if not name.startswith(prefix):
+                break
+            matches.extend(self._by_name[name])
+        return matches
+
+    def by_version(self, version):
+        """Return packages recorded at exactly ``version``."""
+        return list(self._by_version.get(version, ()))
+
+    def installed_versions(self):
+        """Return ``{package: version}`` for every fully installed package."""
+        return {package.name: package.version for package in self.by_state("installed")}
+
+
+def _parse_stanza(stanza):
+    fields = {}
+    field = None
+    for line in stanza.split("\n"):
+        if not line:
+            continue
+        if line[0] in " \t":
+            if field:
+                fields[field] += "\n" + line[1:]
+        else:
+            field, _, value = line.partition(":")
+            fields[field] = value.strip()
+    return fields
+
+
+def iter_status_records(status_path=DPKG_STATUS):
+    """Stream each stanza of a dpkg status file as a dict of fields, reading it through mmap."""
+    with open(status_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = 0
+            size = len(data)
+            while start < size:
+                end = data.find(b"\n\n", start)
+                if end == -1:
+                    end = size
+                stanza = data[start:end].decode("utf-8", errors="replace")
+                start = end + 2
+                if stanza.strip():
+                    yield _parse_stanza(stanza)
+
+
+def load_cached(path, loader):
+    """Return ``loader(path)``, reusing the previous result while the file is unchanged."""
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    entry = _cache.get(path)
+    if entry and entry[0] == key:
+        return entry[1]
+    value = loader(path)
+    _cache[path] = (key, value)
+    return value
+
+
+def load_status(status_path=DPKG_STATUS):
+    """Return a ``StatusIndex`` for ``status_path``, cached until the file changes."""
+    return load_cached(status_path, lambda path: StatusIndex(Package(fields) for fields in iter_status_records(path)))
+
+
+def installed_versions(status_path=DPKG_STATUS):
+    """Return ``{package: version}`` for every fully installed package."""
+    return load_status(status_path).installed_versions()
+
+
+def residual_config_packages(status_path=DPKG_STATUS):
+    """Return packages that were removed but left configuration files behind (``rc`` in dpkg -l)."""
+    return sorted({package.name for package in load_status(status_path).by_state("config-files")})
+
+
+def _parse_os_release(path):
+    values = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, _, value = line.partition("=")
+            values[key] = value.strip().strip("\"'")
+    return values
+
+
+def os_release(path=OS_RELEASE):
+    """Return the fields of os-release as a dict, or an empty dict if it cannot be read."""
+    try:
+        return load_cached(path, _parse_os_release)
+    except OSError:
+        return {}
+
+
+def _order(char):
+    if char == "~":
+        return -1
+    if char.isalpha():
+        return ord(char)
+    return ord(char) + 256
+
+
+def _compare_part(a, b):
+    """Compare upstream versions or revisions with dpkg's alternating non-digit/digit rules."""
+    i = j = 0
+    while i < len(a) or j < len(b):
+        while (i < len(a) and not a[i].isdigit()) or (j < len(b) and not b[j].isdigit()):
+            ac = _order(a[i]) if i < len(a) and not a[i].isdigit() else 0
+            bc = _order(b[j]) if j < len(b) and not b[j].isdigit() else 0
+            if ac != bc:
+                return -1 if ac < bc else 1
+            i += 1
+            j += 1
+        start_i, start_j = i, j
+        while i < len(a) and a[i].isdigit():
+            i += 1
+        while j < len(b) and b[j].isdigit():
+            j += 1
+        an, bn = int(a[start_i:i] or 0), int(b[start_j:j] or 0)
+        if an != bn:
+            return -1 if an < bn else 1
+    return 0
+
+
+def _split_version(version):
+    epoch, _, rest = version.partition(":") if ":" in version else ("0", "", version)
+    upstream, _, revision = rest.rpartition("-") if "-" in rest else (rest, "", "0")
+    return int(epoch or 0), upstream, revision
+
+
+def compare_versions(a, b):
+    """Compare two Debian versions like ``dpkg --compare-versions``; return -1, 0 or 1."""
+    ea, ua, ra = _split_version(a)
+    eb, ub, rb = _split_version(b)
+    if ea != eb:
+        return -1 if ea < eb else 1
+    return _compare_part(ua, ub) or _compare_part(ra, rb)
+
+
+def _kernel_key(release):
+    return tuple(int(part) for part in re.findall(r"\d+", release))
+
+
+def installed_kernels(status_path=DPKG_STATUS):
+    """Return installed kernel releases (e.g. ``5.15.0-91-generic``), oldest first."""
+    releases = set()
+    for package in load_status(status_path).by_prefix("linux-image-"):
+        match = _KERNEL_IMAGE.match(package.name)
+        if match and package.installed:
+            releases.add(match.group(1))
+    return sorted(releases, key=_kernel_key)
+
+
+def old_kernel_packages(keep=1, running=None, status_path=DPKG_STATUS):
+    """Return packages of kernels that can be purged.
+
+    The running kernel and the ``keep`` newest other kernels are kept, along
+    with every package that belongs to them (image, modules, headers).
+    """
+    running = running or os.uname().release
+    kernels = [release for release in installed_kernels(status_path) if release != running]
+    stale = kernels[:-keep] if keep else kernels
+    keep_abis = {_KERNEL_ABI.match(release).group(1) for release in kernels[len(stale):] + [running]
+                 if _KERNEL_ABI.match(release)}
+
+    packages = set()
+    index = load_status(status_path)
+    for release in stale:
+        abi = _KERNEL_ABI.match(release).group(1)
+        if abi in keep_abis:
+            continue
+        pattern = re.compile(rf"^linux-[a-z-]+-{re.escape(abi)}(-[a-z0-9]+)?$")
+        packages.update(package.name for package in index.by_prefix("linux-")
+                        if package.state != "not-installed" and pattern.match(package.name))
+    return sorted(packages)
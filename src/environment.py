@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""The one virtual environment every UbuntuBoost entry point runs in, rebuilt only when its inputs change."""
+import glob
+import hashlib
+import json
+import os
+import sys
+
+try:
+    from .dependencies import ENV_DIR, REQUIREMENTS_FILE, check_requirements, installed_distributions, parse_requirements
+    from .executor import null_sink, run_command
+    from .wheelhouse import PIP_TIMEOUT, Wheelhouse, WheelhouseError
+except ImportError:
+    from dependencies import ENV_DIR, REQUIREMENTS_FILE, check_requirements, installed_distributions, parse_requirements
+    from executor import null_sink, run_command
+    from wheelhouse import PIP_TIMEOUT, Wheelhouse, WheelhouseError
+
+STAMP_FILE = "ubuntuboost-env.json"   # Kept inside the environment, so deleting it resets the stamp too
+
+
+def env_python(env_dir=ENV_DIR):
+    return os.path.join(env_dir, "bin", "python")
+
+
+def _interpreter_version(python):
+    result = run_command([python, "-c", "import sys; print(sys.version)"], timeout=60, sink=null_sink)
+    return result.output.strip() if result.ok else None
+
+
+def _load_stamp(env_dir):
+    try:
+        with open(os.path.join(env_dir, STAMP_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_stamp(env_dir, stamp):
+    path = os.path.join(env_dir, STAMP_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(stamp, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def environment_key(version, requirements_path=REQUIREMENTS_FILE):
+    """Hash of the interpreter version and requirements.txt: the inputs that decide the environment's contents."""
+    digest = hashlib.sha256(version.encode())
+    with open(requirements_path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def ensure_environment(env_dir=ENV_DIR, requirements_path=REQUIREMENTS_FILE, python=sys.executable, wheelhouse=None):
+    """Return ``(python, action)`` for the managed environment, creating or updating it first if needed.
+
+    ``action`` is ``reused`` when the key matches the stamp (nothing runs),
+    ``created`` when the environment is missing or was built by another
+    interpreter (compiled wheels are tied to it), and ``updated`` when only
+    requirements.txt changed: packages no longer pinned are uninstalled and
+    only unmet pins are installed. Raises WheelhouseError or OSError.
+    """
+    version = sys.version if python == sys.executable else _interpreter_version(python)
+    if version is None:
+        raise WheelhouseError(f"cannot run {python}")
+    key = environment_key(version, requirements_path)
+    stamp = _load_stamp(env_dir)
+    target = env_python(env_dir)
+    if stamp.get("key") == key and os.path.exists(target):
+        return target, "reused"
+
+    action = "updated"
+    if not os.path.exists(target) or _interpreter_version(target) != version:
+        result = run_command([python, "-m", "venv", "--clear", env_dir], timeout=PIP_TIMEOUT, sink=null_sink)
+        if not result.ok:
+            raise WheelhouseError(f"creating {env_dir} failed: {' '.join(result.stderr[-3:])}")
+        stamp, action = {}, "created"
+
+    requirements = parse_requirements(requirements_path)
+    wanted = sorted({requirement.key for requirement in requirements})
+    removed = sorted(set(stamp.get("packages", ())) - set(wanted))
+    if removed:
+        run_command([target, "-m", "pip", "uninstall", "-y", *removed], timeout=PIP_TIMEOUT, sink=null_sink)
+    site_packages = glob.glob(os.path.join(env_dir, "lib", "python*", "site-packages"))
+    if check_requirements(requirements, installed_distributions(path=site_packages)):
+        (wheelhouse or Wheelhouse()).install(requirements_path, target)
+
+    _save_stamp(env_dir, {"key": key, "python": version, "packages": wanted})
+    return target, action
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Run commands without a shell, streaming their output and enforcing timeouts."""
+import asyncio
+import os
+import signal
+import sys
+import time
+
+DEFAULT_TIMEOUT = 3600       # Wall-clock limit for one command, in seconds
+DEFAULT_IDLE_TIMEOUT = 600   # Limit on time without any output, in seconds
+KILL_GRACE_PERIOD = 5        # Time between SIGTERM and SIGKILL
+LINE_LIMIT = 1024 * 1024     # Longer output lines are passed on in pieces of this size
+CHUNK_SIZE = 64 * 1024
+# Commands get no terminal to ask on (sudo's password prompt aside); tell debconf not to try
+NONINTERACTIVE_ENV = {"DEBIAN_FRONTEND": "noninteractive"}
+PROMPTING_COMMANDS = {"sudo"}  # May ask for a password on the controlling terminal
+
+
+class CommandResult:
+    """Exit status and captured output of a finished command."""
+
+    def __init__(self, argv, returncode, stdout, stderr, duration, timed_out=None):
+        self.argv = argv
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+        self.timed_out = timed_out  # None, "wall" or "idle"
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.timed_out
+
+    @property
+    def output(self):
+        return "\n".join(self.stdout)
+
+
+def print_sink(stream, line):
+    """Default sink: echo each line to the matching stream of this process."""
+    print(line, file=sys.stderr if stream == "stderr" else sys.stdout, flush=True)
+
+
+def null_sink(stream, line):
+    """Sink that discards output; lines are still captured on the result."""
+
+
+def needs_terminal(argv):
+    """Whether ``argv`` may prompt for a password: sudo run by a non-root user sitting at a terminal."""
+    return (bool(argv) and os.path.basename(argv[0]) in PROMPTING_COMMANDS and hasattr(os, "geteuid")
+            and os.geteuid() != 0 and sys.stdin is not None and sys.stdin.isatty())
+
+
+def _signal_group(process, sig, group=True):
+    try:
+        if group and hasattr(os, "killpg"):
+            os.killpg(process.pid, sig)
+        else:
+            process.send_signal(sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _terminate(process, group=True):
+    """Stop the command and everything it spawned: SIGTERM the group, then SIGKILL.
+
+    Without ``group`` only the command itself is signalled; sudo passes the
+    signal on to what it runs.
+    """
+    _signal_group(process, signal.SIGTERM, group)
+    try:
+        await asyncio.wait_for(process.wait(), KILL_GRACE_PERIOD)
+    except asyncio.TimeoutError:
+        _signal_group(process, getattr(signal, "SIGKILL", signal.SIGTERM), group)
+        await process.wait()
+
+
+async def run_async(argv, timeout=DEFAULT_TIMEOUT, idle_timeout=DEFAULT_IDLE_TIMEOUT, sink=print_sink,
+                    env=None, cwd=None, interactive=None):
+    """Run ``argv`` in its own process group and return a ``CommandResult``.
+
+    Every stdout/stderr line is passed to ``sink(stream, line)`` as soon as it
+    arrives. The whole group is killed if the command runs longer than
+    ``timeout`` or stays silent for ``idle_timeout`` seconds. ``env`` defaults
+    to this process's environment plus ``NONINTERACTIVE_ENV``.
+
+    ``interactive`` commands (by default, those ``needs_terminal`` picks)
+    keep this process's stdin and session instead, so sudo can ask for a
+    password on the terminal; time spent at the prompt counts as idle.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.time()
+    if interactive is None:
+        interactive = needs_terminal(argv)
+    process = await asyncio.create_subprocess_exec(
+        *argv, stdin=None if interactive else asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE, env={**os.environ, **NONINTERACTIVE_ENV} if env is None else env,
+        cwd=cwd, start_new_session=not interactive)
+
+    captured = {"stdout": [], "stderr": []}
+    last_output = loop.time()
+
+    def emit(name, line):
+        text = line.decode("utf-8", errors="replace").rstrip("\r")
+        captured[name].append(text)
+        sink(name, text)
+
+    async def pump(stream, name):
+        # Lines are split here rather than with readline(), which raises on lines over its limit
+        nonlocal last_output
+        pending = b""
+        while True:
+            chunk = await stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            last_output = loop.time()
+            *lines, pending = (pending + chunk).split(b"\n")
+            while len(pending) > LINE_LIMIT:
+                lines.append(pending[:LINE_LIMIT])
+                pending = pending[LINE_LIMIT:]
+            for line in lines:
+                emit(name, line)
+        if pending:
+            emit(name, pending)
+
+    finished = asyncio.gather(pump(process.stdout, "stdout"), pump(process.stderr, "stderr"), process.wait())
+    deadline = loop.time() + timeout if timeout else None
+    timed_out = None
+    try:
+        while not finished.done():
+            now = loop.time()
+            waits = [1.0]
+            if deadline:
+                waits.append(deadline - now)
+            if idle_timeout:
+                waits.append(last_output + idle_timeout - now)
+            try:
+                await asyncio.wait_for(asyncio.shield(finished), max(min(waits), 0))
+            except asyncio.TimeoutError:
+                now = loop.time()
+                if deadline and now >= deadline:
+                    timed_out = "wall"
+                elif idle_timeout and now - last_output >= idle_timeout:
+                    timed_out = "idle"
+                if timed_out:
+                    break
+    except BaseException:
+        # A failing sink or a cancelled caller must not leave the command running
+        await _terminate(process, group=not interactive)
+        finished.cancel()
+        raise
+
+    if timed_out:
+        await _terminate(process, group=not interactive)
+        finished.cancel()
+        try:
+            await finished
+        except asyncio.CancelledError:
+            pass
+    returncode = await process.wait()
+    return CommandResult(list(argv), returncode, captured["stdout"], captured["stderr"],
+                         time.time() - started, timed_out)
+
+
+def run_command(argv, timeout=DEFAULT_TIMEOUT, idle_timeout=DEFAULT_IDLE_TIMEOUT, sink=print_sink,
+                env=None, cwd=None, interactive=None):
+    """Blocking wrapper around ``run_async``; safe to call from worker threads."""
+    try:
+        return asyncio.run(run_async(argv, timeout, idle_timeout, sink, env, cwd, interactive))
+    except (FileNotFoundError, PermissionError) as e:
+        sink("stderr", str(e))
+        return CommandResult(list(argv), 127, [], [str(e)], 0.0)
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Run headless CLI tasks on many hosts over SSH, in rolling batches, and report per-host results.
+
+Each host gets ``<remote-dir>/.venv/bin/python <remote-dir>/src/cli.py --yes
+<task>`` for every task in the pipeline, over one multiplexed OpenSSH
+connection (ControlMaster), so only the first command per host pays for the
+handshake. ``--sync`` copies ``src/`` to the hosts and builds that
+environment there with ``ensure_environment``, holding only the packages the
+CLI imports (click and numpy, pinned as in requirements.txt). At most
+``--concurrency`` hosts run at once. After each batch, if the share of
+failed hosts exceeds ``--max-failure-rate`` the remaining batches are skipped.
+
+``--ssh`` replaces the ssh program. It is called as
+``<ssh> <options...> <host> <remote command>`` and ``<scp> <options...> -r
+<paths...> <host>:<dir>`` for ``--sync``, so a local stand-in script (or a
+wrapper around ``docker exec``) can play the hosts in tests.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    from .dependencies import parse_requirements
+    from .executor import DEFAULT_IDLE_TIMEOUT, DEFAULT_TIMEOUT, CommandResult, null_sink, run_async
+except ImportError:
+    from dependencies import parse_requirements
+    from executor import DEFAULT_IDLE_TIMEOUT, DEFAULT_TIMEOUT, CommandResult, null_sink, run_async
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTROL_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ubuntuboost", "ssh")
+REMOTE_DIR = ".ubuntuboost"               # Relative to the SSH user's home
+FLEET_PACKAGES = ("click", "numpy")       # What src/cli.py imports beyond the standard library
+FLEET_REQUIREMENTS = "requirements-fleet.txt"
+# Run on the host from inside the remote dir: create or reuse .venv with the fleet requirements
+BOOTSTRAP = ("import sys; sys.path.insert(0, 'src'); from environment import ensure_environment; "
+             f"print(ensure_environment('.venv', '{FLEET_REQUIREMENTS}')[1])")
+CONCURRENCY = 16           # Hosts running at the same time
+BATCH_SIZE = 32            # Hosts per rolling batch
+MAX_FAILURE_RATE = 0.25    # Share of failed hosts that stops further batches
+CONNECT_TIMEOUT = 10       # Seconds to establish one SSH connection
+CONTROL_PERSIST = 300      # Seconds an idle master connection stays open
+SSH_UNREACHABLE = 255      # ssh's own exit code for connection and auth errors
+STDERR_TAIL = 5            # stderr lines kept per failed host
+
+
+def load_inventory(path):
+    """Read one ``[user@]host`` per line, skipping blanks, comments and duplicates."""
+    hosts = []
+    with open(path) as f:
+        for line in f:
+            host = line.split("#", 1)[0].strip()
+            if host and host not in hosts:
+                hosts.append(host)
+    return hosts
+
+
+def ssh_options(control_dir=CONTROL_DIR):
+    """Options shared by ssh and scp: no prompts, and one persistent master connection per host."""
+    return ["-o", "BatchMode=yes", "-o", f"ConnectTimeout={CONNECT_TIMEOUT}",
+            "-o", "ControlMaster=auto", "-o", f"ControlPath={os.path.join(control_dir, '%C')}",
+            "-o", f"ControlPersist={CONTROL_PERSIST}"]
+
+
+def write_fleet_requirements(path):
+    """Write the requirements.txt pins of ``FLEET_PACKAGES`` to ``path`` and return it."""
+    with open(path, "w") as f:
+        for requirement in parse_requirements():
+            if requirement.key in FLEET_PACKAGES:
+                f.write(f"{requirement}\n")
+    return path
+
+
+class HostResult:
+    """Outcome of the pipeline on one host, built from the CLI's JSON-lines events."""
+
+    def __init__(self, host, batch):
+        self.host = host
+        self.batch = batch
+        self.status = "skipped"   # ok, failed, unreachable, timeout or skipped
+        self.exit_code = None
+        self.duration = 0.0
+        self.tasks = {}           # task name -> {"ok": bool, "duration": seconds}
+        self.errors = []
+
+    @property
+    def failed(self):
+        return self.status not in ("ok", "skipped")
+
+    def event(self, line):
+        """Record one stdout line; non-JSON lines (banners, motd) are ignored."""
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return
+        if not isinstance(record, dict):
+            return
+        if record.get("event") == "task_end":
+            self.tasks[record["task"]] = {"ok": record.get("ok", False), "duration": record.get("duration", 0.0)}
+        elif record.get("event") == "log" and record.get("level") == "error":
+            self.errors.append(record.get("message", ""))
+
+    def to_dict(self):
+        return {"host": self.host, "batch": self.batch, "status": self.status, "exit_code": self.exit_code,
+                "duration": round(self.duration, 3), "tasks": self.tasks, "errors": self.errors}
+
+
+class Fleet:
+    """Runs a task pipeline on many hosts with bounded concurrency and a failure-rate circuit breaker."""
+
+    def __init__(self, hosts, tasks=("full",), concurrency=CONCURRENCY, batch_size=BATCH_SIZE,
+                 max_failure_rate=MAX_FAILURE_RATE, ssh="ssh", scp="scp", remote_dir=REMOTE_DIR,
+                 python="python3", use_env=True, sudo=True, sync=False, timeout=DEFAULT_TIMEOUT,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, control_dir=CONTROL_DIR):
+        self.hosts = list(hosts)
+        self.tasks = list(tasks)
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_failure_rate = max_failure_rate
+        self.ssh = shlex.split(ssh)
+        self.scp = shlex.split(scp)
+        self.remote_dir = remote_dir
+        self.python = python      # Builds the environment, or runs the CLI itself without use_env
+        self.use_env = use_env
+        self.sudo = sudo
+        self.sync = sync
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.control_dir = control_dir
+        self.tripped_after = None  # Batch after which the breaker opened
+
+    def batches(self):
+        return [self.hosts[i:i + self.batch_size] for i in range(0, len(self.hosts), self.batch_size)]
+
+    def remote_command(self, task):
+        python = f"{self.remote_dir}/.venv/bin/python" if self.use_env else self.python
+        argv = [python, f"{self.remote_dir}/src/cli.py", "--yes", "--no-command-output", *shlex.split(task)]
+        if self.sudo:
+            argv = ["sudo", "-n", *argv]
+        return shlex.join(argv)
+
+    async def _run(self, argv, sink=null_sink):
+        try:
+            return await run_async(argv, self.timeout, self.idle_timeout, sink)
+        except OSError as e:
+            return CommandResult(list(argv), 127, [], [str(e)], 0.0)
+
+    async def _sync(self, host, result, requirements):
+        """Copy the CLI to the host and provision its environment over the master connection.
+
+        Returns True on success. The environment is rebuilt only when the
+        host's interpreter or the fleet requirements change.
+        """
+        options = ssh_options(self.control_dir)
+        steps = [
+            [*self.ssh, *options, host, shlex.join(["mkdir", "-p", self.remote_dir])],
+            [*self.scp, *options, "-q", "-r", os.path.join(REPO_ROOT, "src"), requirements, f"{host}:{self.remote_dir}/"],
+        ]
+        if self.use_env:
+            steps.append([*self.ssh, *options, host,
+                          f"cd {shlex.quote(self.remote_dir)} && {shlex.join([self.python, '-c', BOOTSTRAP])}"])
+        for argv in steps:
+            outcome = await self._run(argv)
+            if not outcome.ok:
+                result.exit_code = outcome.returncode
+                result.status = "unreachable" if outcome.returncode == SSH_UNREACHABLE else "failed"
+                result.errors.extend(outcome.stderr[-STDERR_TAIL:] or ["sync failed"])
+                return False
+        return True
+
+    async def run_host(self, host, batch, requirements=None):
+        """Run every task on ``host`` in order, stopping at the first that fails.
+
+        ``requirements`` is the fleet requirements file to sync, when syncing.
+        """
+        result = HostResult(host, batch)
+        started = time.perf_counter()
+        result.status = "ok"
+        if not requirements or await self._sync(host, result, requirements):
+            for task in self.tasks:
+                argv = [*self.ssh, *ssh_options(self.control_dir), host, self.remote_command(task)]
+                outcome = await self._run(argv, lambda stream, line: stream == "stdout" and result.event(line))
+                result.exit_code = outcome.returncode
+                if outcome.ok:
+                    continue
+                if outcome.timed_out:
+                    result.status = "timeout"
+                    result.errors.append(f"{task}: no result after {outcome.duration:.0f}s ({outcome.timed_out} timeout)")
+                elif outcome.returncode == SSH_UNREACHABLE:
+                    result.status = "unreachable"
+                    result.errors.extend(outcome.stderr[-STDERR_TAIL:])
+                else:
+                    result.status = "failed"
+                    if not result.errors:
+                        result.errors.extend(outcome.stderr[-STDERR_TAIL:])
+                break
+        result.duration = time.perf_counter() - started
+        return result
+
+    async def run_async(self, progress=None):
+        """Run all batches and return the ``HostResult`` of every host, skipped ones included."""
+        os.makedirs(self.control_dir, mode=0o700, exist_ok=True)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results, done, failed = [], 0, 0
+        with tempfile.TemporaryDirectory() as tmp:
+            requirements = write_fleet_requirements(os.path.join(tmp, FLEET_REQUIREMENTS)) if self.sync else None
+
+            async def bounded(host, batch):
+                async with semaphore:
+                    result = await self.run_host(host, batch, requirements)
+                if progress:
+                    progress(result)
+                return result
+
+            for number, batch in enumerate(self.batches(), 1):
+                if self.tripped_after is not None:
+                    results.extend(HostResult(host, number) for host in batch)
+                    continue
+                batch_results = await asyncio.gather(*(bounded(host, number) for host in batch))
+                results.extend(batch_results)
+                done += len(batch_results)
+                failed += sum(result.failed for result in batch_results)
+                if failed / done > self.max_failure_rate and number < len(self.batches()):
+                    self.tripped_after = number
+        return results
+
+    def run(self, progress=None):
+        try:
+            return asyncio.run(self.run_async(progress))
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop the master connections this run opened."""
+        for host in self.hosts:
+            try:
+                subprocess.run([*self.ssh, *ssh_options(self.control_dir), "-O", "exit", host],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=CONNECT_TIMEOUT)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def build_report(fleet, results, duration):
+    """Aggregate host results: counts by status, host and task timings, and the circuit breaker state."""
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    ran = [result for result in results if result.status != "skipped"]
+    durations = [result.duration for result in ran]
+    task_times = {}
+    for result in ran:
+        for name, task in result.tasks.items():
+            task_times.setdefault(name, []).append(task["duration"])
+    return {
+        "tasks": fleet.tasks,
+        "hosts": len(results),
+        "counts": counts,
+        "failure_rate": round(sum(result.failed for result in ran) / len(ran), 3) if ran else 0.0,
+        "circuit_breaker": {"max_failure_rate": fleet.max_failure_rate, "tripped_after_batch": fleet.tripped_after},
+        "duration": round(duration, 3),
+        "host_duration": {"p50": round(_percentile(durations, 0.5), 3), "p95": round(_percentile(durations, 0.95), 3),
+                          "max": round(max(durations, default=0.0), 3)},
+        "task_duration": {name: {"median": round(statistics.median(times), 3), "max": round(max(times), 3),
+                                 "hosts": len(times)} for name, times in task_times.items()},
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def print_report(report):
+    icons = {"ok": "✅", "failed": "❌", "unreachable": "🔌", "timeout": "⏱️", "skipped": "⏭️"}
+    print(f"\n📋 {report['hosts']} hosts, {' · '.join(f'{icons.get(k, k)} {k} {v}' for k, v in report['counts'].items())}"
+          f" in {report['duration']:.1f}s")
+    timing = report["host_duration"]
+    print(f"   per host: p50 {timing['p50']:.1f}s  p95 {timing['p95']:.1f}s  max {timing['max']:.1f}s")
+    for name, task in sorted(report["task_duration"].items(), key=lambda item: -item[1]["median"]):
+        print(f"   {name:<24} median {task['median']:7.2f}s  max {task['max']:7.2f}s  on {task['hosts']} hosts")
+    if report["circuit_breaker"]["tripped_after_batch"] is not None:
+        print(f"⚠️ Failure rate above {report['circuit_breaker']['max_failure_rate']:.0%}: stopped after batch "
+              f"{report['circuit_breaker']['tripped_after_batch']}.")
+    for result in report["results"]:
+        if result["status"] not in ("ok", "skipped"):
+            print(f"{icons.get(result['status'], '❌')} {result['host']}: {result['status']} (exit {result['exit_code']})"
+                  f"{': ' + result['errors'][-1] if result['errors'] else ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run UbuntuBoost CLI tasks on many hosts over SSH.")
+    parser.add_argument("hosts", nargs="*", help="[user@]host to run on")
+    parser.add_argument("-i", "--inventory", help="file with one [user@]host per line")
+    parser.add_argument("-t", "--task", action="append", dest="tasks",
+                        help="src/cli.py command to run, repeatable and run in order (default: full)")
+    parser.add_argument("-c", "--concurrency", type=int, default=CONCURRENCY, help="hosts running at the same time")
+    parser.add_argument("-b", "--batch-size", type=int, default=BATCH_SIZE, help="hosts per rolling batch")
+    parser.add_argument("--max-failure-rate", type=float, default=MAX_FAILURE_RATE,
+                        help="stop starting batches once this share of hosts has failed")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help="seconds allowed per task per host")
+    parser.add_argument("--sync", action="store_true",
+                        help="copy src/ to the hosts and build the CLI's environment there first")
+    parser.add_argument("--remote-dir", default=REMOTE_DIR, help="UbuntuBoost copy on the hosts, relative to the home directory")
+    parser.add_argument("--python", default="python3", help="interpreter on the hosts that builds the environment")
+    parser.add_argument("--no-env", action="store_true",
+                        help="run the CLI with --python itself; its click and numpy are already installed")
+    parser.add_argument("--no-sudo", action="store_true", help="do not run the CLI through sudo -n")
+    parser.add_argument("--ssh", default="ssh", help="ssh program, or a local stand-in for tests")
+    parser.add_argument("--scp", default="scp", help="scp program used by --sync")
+    parser.add_argument("--report", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    hosts = list(args.hosts)
+    if args.inventory:
+        hosts += [host for host in load_inventory(args.inventory) if host not in hosts]
+    if not hosts:
+        parser.error("no hosts given")
+    if args.concurrency < 1 or args.batch_size < 1 or not 0 <= args.max_failure_rate <= 1:
+        parser.error("--concurrency and --batch-size must be positive and --max-failure-rate between 0 and 1")
+
+    fleet = Fleet(hosts, args.tasks or ["full"], args.concurrency, args.batch_size, args.max_failure_rate,
+                  ssh=args.ssh, scp=args.scp, remote_dir=args.remote_dir, python=args.python,
+                  use_env=not args.no_env, sudo=not args.no_sudo, sync=args.sync, timeout=args.timeout)
+    print(f"🚀 {len(hosts)} hosts, {len(fleet.batches())} batches, {args.concurrency} at a time: {', '.join(fleet.tasks)}")
+    started = time.perf_counter()
+    try:
+        results = fleet.run(lambda result: print(f"   {result.host}: {result.status} in {result.duration:.1f}s", flush=True))
+    except KeyboardInterrupt:
+        return 130
+    report = build_report(fleet, results, time.perf_counter() - started)
+    print_report(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.report}")
+    return 0 if not report["failure_rate"] and fleet.tripped_after is None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
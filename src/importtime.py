@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Cold-start import profile of the UbuntuBoost entry points, built from ``python -X importtime``."""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ("ubuntuGame", "run", "src.optimizer")
+IMPORT_BUDGET_MS = 150   # Cold-start budget per entry point on our slow VMs
+RUNS = 3                 # Imports measured per entry point; the fastest is reported
+TOP = 10                 # Slowest imports listed per entry point
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(text):
+    """Return ``(module, self_us, cumulative_us, depth)`` for each ``-X importtime`` line."""
+    entries = []
+    for line in text.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def profile_import(module, python=sys.executable, cwd=REPO_ROOT):
+    """Import ``module`` in a fresh interpreter; return ``(total_us, entries)``."""
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"], cwd=cwd,
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"import {module} failed: {result.stderr.strip().splitlines()[-1:]}")
+    entries = parse_importtime(result.stderr)
+    # Top-level lines are everything the interpreter imported to satisfy the statement
+    total = sum(cumulative for _, _, cumulative, depth in entries if depth == 0)
+    return total, entries
+
+
+def best_profile(module, runs=RUNS, **kwargs):
+    """Profile ``runs`` imports and keep the fastest, which is the least disturbed by other load."""
+    return min((profile_import(module, **kwargs) for _ in range(runs)), key=lambda profile: profile[0])
+
+
+def report(module, total, entries, budget_ms=IMPORT_BUDGET_MS, top=TOP):
+    """Print one entry point's total and its slowest imports; return True if within budget."""
+    within = total / 1000 <= budget_ms
+    print(f"{'✅' if within else '❌'} {module}: {total / 1000:.1f} ms (budget {budget_ms} ms)")
+    for name, self_us, cumulative_us, depth in sorted(entries, key=lambda entry: -entry[2])[:top]:
+        print(f"   {cumulative_us / 1000:8.1f} ms cumulative {self_us / 1000:8.1f} ms self  {name}")
+    return within
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report cold-start import time of UbuntuBoost entry points.")
+    parser.add_argument("modules", nargs="*", default=list(ENTRY_POINTS), help="modules to import (default: all entry points)")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="fail if an import takes longer")
+    parser.add_argument("--runs", type=int, default=RUNS, help="imports per module; the fastest is reported")
+    parser.add_argument("--top", type=int, default=TOP, help="slowest imports listed per module")
+    args = parser.parse_args(argv)
+
+    within = True
+    for module in args.modules:
+        total, entries = best_profile(module, runs=args.runs)
+        within = report(module, total, entries, args.budget_ms, args.top) and within
+    return 0 if within else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Defer loading heavy modules (pygame, numpy, tkinter) until a mode actually uses them."""
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Return module ``name`` without executing it; the import runs on first attribute access.
+
+    Raises ImportError straight away if the module is not installed, so
+    missing dependencies are still reported at startup.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Sample real system metrics from /proc and /sys into a fixed-size ring buffer."""
+import glob
+import os
+import threading
+import time
+
+try:
+    from .lazy import lazy_import
+except ImportError:
+    from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+SAMPLE_INTERVAL = 0.5   # Seconds between background samples
+CAPACITY = 1200         # Samples kept (10 minutes at the default interval)
+
+# Columns of each sample, after the timestamp.
+FIELDS = (
+    "cpu_busy_pct",       # CPU time not idle/iowait since the previous sample
+    "iowait_pct",         # CPU time waiting on I/O since the previous sample
+    "mem_used_pct",       # 100 - MemAvailable / MemTotal
+    "swap_used_pct",
+    "psi_cpu_some",       # /proc/pressure avg10 values
+    "psi_memory_some",
+    "psi_io_some",
+    "temp_max_c",         # Hottest thermal zone
+    "freq_avg_mhz",       # Mean current frequency over all CPUs
+)
+
+
+def _read(path):
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class MetricsSampler:
+    """Background sampler backed by a NumPy ring buffer of shape ``(capacity, 1 + len(FIELDS))``.
+
+    Column 0 holds the sample timestamp; missing readings (no PSI support, no
+    thermal zones, containers...) are stored as NaN. ``proc_root`` and
+    ``sys_root`` can point at a fake tree for testing.
+    """
+
+    def __init__(self, capacity=CAPACITY, interval=SAMPLE_INTERVAL, proc_root="/proc", sys_root="/sys"):
+        self.interval = interval
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+        self.capacity = capacity
+        self._buffer = None
+        self.count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._prev_cpu = None
+        self._thermal_paths = glob.glob(os.path.join(sys_root, "class", "thermal", "thermal_zone*", "temp"))
+        self._freq_paths = glob.glob(os.path.join(sys_root, "devices", "system", "cpu", "cpu[0-9]*", "cpufreq", "scaling_cur_freq"))
+
+    @property
+    def buffer(self):
+        # Allocated on first use, so creating a sampler does not load NumPy
+        if self._buffer is None:
+            self._buffer = np.full((self.capacity, 1 + len(FIELDS)), np.nan)
+        return self._buffer
+
+    # Readers
+    def _cpu_times(self):
+        text = _read(os.path.join(self.proc_root, "stat"))
+        if not text or not text.startswith("cpu "):
+            return np.nan, np.nan
+        values = np.array(text.split("\n", 1)[0].split()[1:9], dtype=np.float64)
+        prev, self._prev_cpu = self._prev_cpu, values
+        if prev is None:
+            return np.nan, np.nan
+        delta = values - prev
+        total = delta.sum()
+        if total <= 0:
+            return np.nan, np.nan
+        idle, iowait = delta[3], delta[4]
+        return 100.0 * (total - idle - iowait) / total, 100.0 * iowait / total
+
+    def _memory(self):
+        text = _read(os.path.join(self.proc_root, "meminfo"))
+        if not text:
+            return np.nan, np.nan
+        info = {}
+        for line in text.splitlines():
+            key, _, value = line.partition(":")
+            parts = value.split()
+            if parts:
+                info[key] = float(parts[0])
+        mem_total = info.get("MemTotal")
+        swap_total = info.get("SwapTotal")
+        mem = 100.0 * (1 - info.get("MemAvailable", np.nan) / mem_total) if mem_total else np.nan
+        swap = 100.0 * (1 - info.get("SwapFree", np.nan) / swap_total) if swap_total else np.nan
+        return mem, swap
+
+    def _pressure(self, resource):
+        text = _read(os.path.join(self.proc_root, "pressure", resource))
+        if not text:
+            return np.nan
+        for line in text.splitlines():
+            if line.startswith("some "):
+                for item in line.split()[1:]:
+                    key, _, value = item.partition("=")
+                    if key == "avg10":
+                        return float(value)
+        return np.nan
+
+    def _average(self, paths, scale, reduce):
+        values = []
+        for path in paths:
+            text = _read(path)
+            if text and text.strip().lstrip("-").isdigit():
+                values.append(int(text) / scale)
+        return reduce(values) if values else np.nan
+
+    def sample(self):
+        """Read every source once and return the row (timestamp first) that was recorded."""
+        with self._lock:
+            cpu_busy, iowait = self._cpu_times()
+            mem, swap = self._memory()
+            row = np.array([
+                time.time(), cpu_busy, iowait, mem, swap,
+                self._pressure("cpu"), self._pressure("memory"), self._pressure("io"),
+                self._average(self._thermal_paths, 1000.0, max),
+                self._average(self._freq_paths, 1000.0, lambda v: sum(v) / len(v)),
+            ])
+            self.buffer[self.count % len(self.buffer)] = row
+            self.count += 1
+        return row
+
+    # Background thread
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start sampling in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # Queries
+    def samples(self):
+        """Return recorded rows, oldest first."""
+        with self._lock:
+            size = len(self.buffer)
+            if self.count <= size:
+                return self.buffer[:self.count].copy()
+            start = self.count % size
+            return np.concatenate((self.buffer[start:], self.buffer[:start]))
+
+    def snapshot(self, window=2.0):
+        """Return ``{field: value}`` averaged over the last ``window`` seconds.
+
+        Without a running sampler a fresh reading is taken instead, so the
+        CPU fields need at least one earlier ``sample()`` call to be known.
+        """
+        if not self.running:
+            rows = self.sample()[None, :]
+        else:
+            rows = self.samples()
+            rows = rows[rows[:, 0] >= time.time() - window]
+            if not len(rows):
+                rows = self.sample()[None, :]
+        values = {}
+        for i, field in enumerate(FIELDS, start=1):
+            column = rows[:, i]
+            column = column[~np.isnan(column)]
+            values[field] = float(column.mean()) if len(column) else float("nan")
+        return values
+
+
+def metrics_delta(before, after):
+    """Return ``{field: (before, after, change)}`` for fields measured on both sides."""
+    return {field: (before[field], after[field], after[field] - before[field])
+            for field in FIELDS if not np.isnan(before[field]) and not np.isnan(after[field])}
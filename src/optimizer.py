@@ -1,50 +1,92 @@
 #!/usr/bin/env python3
 # By https://github.com/kvnbbg
+import argparse
+import contextlib
+import io
 import os
-import subprocess
 import platform
 import sys
-import venv
-import shutil
 import time
 import random
-import numpy as np
+import shlex
+
+try:
+    from .scheduler import TaskGraph, TaskResult, MAX_WORKERS
+    from .backend import LocalBackend, RecordingBackend
+    from .plan import estimate_apt, expected_duration, format_bytes, load_timings, record_timings
+    from .retry import RULES as RETRY_RULES, classify, backoff_delay
+    from .metrics import MetricsSampler, metrics_delta
+    from .benchmark import benchmark_step, save_report
+    from .profiles import PROFILES, ProfileError
+    from .sources import SOURCES_DIR, validate_sources
+    from .apt_planner import APT_GET, AptPlan
+    from .dpkg import os_release, old_kernel_packages, residual_config_packages
+except ImportError:
+    from scheduler import TaskGraph, TaskResult, MAX_WORKERS
+    from backend import LocalBackend, RecordingBackend
+    from plan import estimate_apt, expected_duration, format_bytes, load_timings, record_timings
+    from retry import RULES as RETRY_RULES, classify, backoff_delay
+    from metrics import MetricsSampler, metrics_delta
+    from benchmark import benchmark_step, save_report
+    from profiles import PROFILES, ProfileError
+    from sources import SOURCES_DIR, validate_sources
+    from apt_planner import APT_GET, AptPlan
+    from dpkg import os_release, old_kernel_packages, residual_config_packages
 
 # Constants
-VENV_PATH = "my_venv"
 TOTAL_TASKS = 10
 RETRY_LIMIT = 5
+COMMAND_TIMEOUT = 3600  # Wall-clock limit per command, in seconds
+IDLE_TIMEOUT = 600      # Limit on a command producing no output, in seconds
+KEEP_KERNELS = 1
+SWAP_SETTINGS = {"vm.swappiness": 10, "vm.vfs_cache_pressure": 50}
+SYSTEM_PACKAGES = ["cpufrequtils", "thermald", "tlp", "tlp-rdw", "ufw", "build-essential", "git", "curl", "wget", "htop", "net-tools"]
 
-# System metrics (initially set to default values)
-cpu_performance = 1.0
-thermal_efficiency = 1.0
-power_consumption = 1.0
+# Where commands, file writes and tuning changes go (swapped for a recorder in --plan mode)
+backend = LocalBackend()
+
+# Real system metrics, sampled in the background while tasks run
+metrics_sampler = MetricsSampler()
+
+# Probe each sources.list.d entry's mirror when validating sources (--probe-mirrors), optionally
+# sending every probe to one stand-in server instead of the real mirrors (--mirror-base-url)
+PROBE_MIRRORS = False
+MIRROR_BASE_URL = None
+
+# When set, log() hands (level, message) to it instead of printing (used by the headless CLI)
+log_handler = None
+LOG_LEVELS = {"\033[31m": "error", "\033[33m": "warning", "\033[32m": "success"}
 
 # Utility functions
 def log(message, color_code="\033[32m", emoji="💡"):
     """Log messages to the terminal with color and emojis."""
+    if log_handler:
+        log_handler(LOG_LEVELS.get(color_code, "info"), message)
+        return
     print(f"{color_code}{emoji} {message}\033[0m")
 
-def execute_command(command, retries=3, check_output=False):
-    """Execute a command with optional retries and output checking."""
+def execute_command(command, retries=3, check_output=False, timeout=COMMAND_TIMEOUT, idle_timeout=IDLE_TIMEOUT):
+    """Execute an argv list (no shell) with optional retries and output checking."""
+    if isinstance(command, str):
+        command = shlex.split(command)
     for attempt in range(retries):
         try:
-            if check_output:
-                return subprocess.check_output(command, shell=True, text=True)
-            subprocess.check_call(command, shell=True)
-            return True
-        except subprocess.CalledProcessError:
-            log(f"Command failed: {command} (Attempt {attempt+1}/{retries})", "\033[31m", "❌")
-            if attempt + 1 == retries:
-                log("Max retry limit reached. Proceeding to the next task...", "\033[31m", "⚠️")
-                return False
+            result = backend.run(command, timeout=timeout, idle_timeout=idle_timeout)
         except Exception as e:
             log(f"Unexpected error: {e}", "\033[31m", "❌")
             return False
+        if result.ok:
+            return result.output if check_output else True
+        if result.timed_out:
+            log(f"Command timed out ({result.timed_out}): {shlex.join(command)}", "\033[31m", "⏰")
+        log(f"Command failed: {shlex.join(command)} (Attempt {attempt+1}/{retries})", "\033[31m", "❌")
+        if attempt + 1 == retries:
+            log("Max retry limit reached. Proceeding to the next task...", "\033[31m", "⚠️")
+            return False
 
 def is_ubuntu():
     """Check if the OS is Ubuntu."""
-    return platform.system() == "Linux" and "Ubuntu" in subprocess.getoutput("lsb_release -d")
+    return platform.system() == "Linux" and os_release().get("ID") == "ubuntu"
 
 def ensure_ubuntu():
     """Ensure the script is running on Ubuntu, otherwise exit."""
@@ -52,6 +94,14 @@ def ensure_ubuntu():
         log("This script is designed to run only on Ubuntu. Exiting.", "\033[31m", "❌")
         sys.exit(1)
 
+def ensure_sudo():
+    """Ask for the sudo password once up front, so parallel tasks do not all prompt for it."""
+    if os.geteuid() == 0:
+        return
+    if not backend.run(["sudo", "-v"], interactive=True).ok:
+        log("Administrator rights are needed to optimize the system. Exiting.", "\033[31m", "❌")
+        sys.exit(1)
+
 def prompt_user_name():
     """Prompt the user to input their name or choose a random one."""
     user_input = input("Enter your name or press Enter for a random name: ").strip()
@@ -61,64 +111,68 @@ def prompt_user_name():
     log(f"Hello, {user_name}! Let's optimize your system.", "\033[34m", "👋")
     return user_name
 
-def create_virtualenv(venv_path=VENV_PATH):
-    """Create a virtual environment if it doesn't exist."""
-    if not os.path.exists(venv_path):
-        log(f"Creating virtual environment at {venv_path}...", "\033[34m", "🔧")
-        venv.create(venv_path, with_pip=True)
-        log(f"Virtual environment created at {venv_path}.", "\033[32m", "✅")
-    else:
-        log(f"Virtual environment already exists at {venv_path}.", "\033[33m", "ℹ️")
-
-def delete_virtualenv(venv_path=VENV_PATH):
-    """Delete the virtual environment if it exists."""
-    if os.path.exists(venv_path):
-        log(f"Deleting virtual environment at {venv_path}...", "\033[34m", "🗑️")
-        shutil.rmtree(venv_path)
-        log("Virtual environment deleted.", "\033[32m", "✅")
-
-def adjust_system_metrics():
-    """Randomly adjust system metrics to simulate performance changes."""
-    global cpu_performance, thermal_efficiency, power_consumption
-    cpu_performance *= np.random.uniform(0.95, 1.05)
-    thermal_efficiency *= np.random.uniform(0.98, 1.02)
-    power_consumption *= np.random.uniform(0.90, 1.10)
-    log(f"Metrics adjusted: CPU={cpu_performance:.2f}, Thermal={thermal_efficiency:.2f}, Power={power_consumption:.2f}", "\033[34m", "📊")
+def report_metrics_delta(before, after):
+    """Log how measured system metrics changed across a task."""
+    changes = metrics_delta(before, after)
+    if not changes:
+        return
+    summary = ", ".join(f"{field}={old:.1f}→{new:.1f} ({change:+.1f})" for field, (old, new, change) in changes.items())
+    log(f"Metrics: {summary}", "\033[34m", "📊")
 
 def run_command_with_options(command, success_msg, error_msg, retry=False, force_remove=False, auto_install=False, cleanup_sources=False):
-    """Run a command with various options for retrying, removing, and auto-installing dependencies."""
-    retry_count = 0
+    """Run an argv command, retrying according to how it failed.
+
+    Transient failures (dpkg lock, network, timeout) back off with jitter and
+    retry untouched; structural ones (bad mirror, broken dependencies,
+    interrupted dpkg) run only the matching remediation, and only if the
+    corresponding option is enabled.
+    """
+    remediations = {
+        "regenerate_sources": regenerate_sources_list if cleanup_sources else None,
+        "validate_sources": clean_sources_list_d if force_remove else None,
+        "fix_broken": install_missing_dependencies if auto_install else None,
+        "configure_pending": configure_pending_packages if auto_install else None,
+    }
+    attempt = 0
 
-    while retry_count < RETRY_LIMIT:
-        start_time = time.time()
-        success = execute_command(command)
-        elapsed_time = time.time() - start_time
+    while True:
+        attempt += 1
+        before = metrics_sampler.snapshot()
+        result = backend.run(command, timeout=COMMAND_TIMEOUT, idle_timeout=IDLE_TIMEOUT)
 
-        if success:
-            adjust_system_metrics()
-            log(f"{success_msg} in {elapsed_time:.2f} seconds.", "\033[32m", "✅")
-            break
+        if result.ok:
+            log(f"{success_msg} in {result.duration:.2f} seconds.", "\033[32m", "✅")
+            report_metrics_delta(before, metrics_sampler.snapshot())
+            return True
 
-        retry_count += 1
-        log(f"{error_msg} (Attempt {retry_count}/{RETRY_LIMIT})", "\033[31m", "❌")
-        if cleanup_sources:
-            regenerate_sources_list()
-        if force_remove:
-            force_remove_problematic_sources()
-        if auto_install:
-            install_missing_dependencies()
-        if retry_count >= RETRY_LIMIT:
+        kind = classify(result)
+        rule = RETRY_RULES[kind]
+        max_attempts = min(rule.max_attempts, RETRY_LIMIT) if retry else 1
+        log(f"{error_msg} [{kind}] (Attempt {attempt}/{max_attempts})", "\033[31m", "❌")
+        if attempt >= max_attempts:
             log("Max retry limit reached. Proceeding to the next task...", "\033[31m", "⚠️")
-            break
+            return False
+
+        for name in rule.remediation:
+            if remediations[name]:
+                remediations[name]()
+        delay = backoff_delay(rule, attempt)
+        if delay:
+            log(f"Retrying in {delay:.1f} seconds...", "\033[33m", "⏳")
+            time.sleep(delay)
 
 def regenerate_sources_list():
     """Regenerate the sources.list file to ensure only valid sources are used."""
     backup_sources_list()
+    codename = os_release().get("VERSION_CODENAME") or os_release().get("UBUNTU_CODENAME")
+    if not codename:
+        log("Could not determine the Ubuntu codename from /etc/os-release.", "\033[31m", "❌")
+        return
     try:
-        with open("/etc/apt/sources.list", "w") as sources_list:
-            sources_list.write("deb http://archive.ubuntu.com/ubuntu/ $(lsb_release -sc) main restricted universe multiverse\n")
-            sources_list.write("deb http://archive.ubuntu.com/ubuntu/ $(lsb_release -sc)-updates main restricted universe multiverse\n")
-            sources_list.write("deb http://archive.ubuntu.com/ubuntu/ $(lsb_release -sc)-security main restricted universe multiverse\n")
+        backend.write_file("/etc/apt/sources.list",
+                           f"deb http://archive.ubuntu.com/ubuntu/ {codename} main restricted universe multiverse\n"
+                           f"deb http://archive.ubuntu.com/ubuntu/ {codename}-updates main restricted universe multiverse\n"
+                           f"deb http://archive.ubuntu.com/ubuntu/ {codename}-security main restricted universe multiverse\n")
         log("sources.list regenerated with default Ubuntu repositories.", "\033[32m", "✅")
     except Exception as e:
         log(f"Failed to regenerate sources.list: {e}", "\033[31m", "❌")
@@ -127,37 +181,46 @@ def backup_sources_list():
     """Backup the existing sources.list file."""
     log("Backing up existing sources.list...", "\033[34m", "🔄")
     try:
-        shutil.copy("/etc/apt/sources.list", "/etc/apt/sources.list.backup")
+        backend.copy("/etc/apt/sources.list", "/etc/apt/sources.list.backup")
         log("Backup of sources.list created at /etc/apt/sources.list.backup", "\033[32m", "✅")
     except Exception as e:
         log(f"Failed to create backup of sources.list: {e}", "\033[31m", "❌")
 
-def force_remove_problematic_sources():
-    """Force remove problematic sources and conflicting packages."""
-    log("Forcing removal of problematic sources and packages...", "\033[33m", "🔄")
-    execute_command("sudo rm -f /etc/apt/sources.list.d/*.list")
-    execute_command("sudo apt remove --purge -y $(dpkg --list | grep '^rc' | awk '{print $2}')")
-
 def install_missing_dependencies():
     """Install missing dependencies automatically."""
     log("Installing missing dependencies...", "\033[33m", "🔄")
-    execute_command("sudo apt install -f")
-
-def clean_sources_list_d():
-    """Clean the sources.list.d directory to remove malformed entries."""
-    sources_list_dir = "/etc/apt/sources.list.d"
-    for file in os.listdir(sources_list_dir):
-        if file.endswith(".list"):
-            file_path = os.path.join(sources_list_dir, file)
-            log(f"Checking {file_path} for errors...", "\033[34m", "🔄")
+    execute_command(["sudo"] + APT_GET + ["install", "-f"])
+
+def configure_pending_packages():
+    """Finish configuring packages left half-installed by an interrupted dpkg run."""
+    log("Configuring interrupted package installations...", "\033[33m", "🔄")
+    execute_command(["sudo", "dpkg", "--configure", "-a"])
+
+def clean_sources_list_d(probe=None, base_url=None):
+    """Validate sources.list.d and move files with malformed entries to a backup.
+
+    ``probe`` and ``base_url`` default to ``PROBE_MIRRORS`` and ``MIRROR_BASE_URL``.
+    """
+    probe = PROBE_MIRRORS if probe is None else probe
+    try:
+        reports = validate_sources(probe=probe, base_url=base_url or MIRROR_BASE_URL)
+    except OSError as e:
+        log(f"Failed to read {SOURCES_DIR}: {e}", "\033[31m", "❌")
+        return False
+    for report in reports:
+        if report.read_error:
+            # Never move a file that could not be read: it may well be valid
+            log(f"Could not read {report.path}: {report.read_error}. Leaving it in place.", "\033[33m", "⚠️")
+        elif not report.valid:
+            details = "; ".join(f"line {line}: {message}" for line, message in report.errors)
+            log(f"Malformed entries found in {report.path} ({details}). Moving to backup.", "\033[31m", "❌")
             try:
-                with open(file_path, "r") as f:
-                    lines = f.readlines()
-                    if not all(line.startswith("deb") or line.startswith("#") for line in lines):
-                        log(f"Malformed entries found in {file_path}. Moving to backup.", "\033[31m", "❌")
-                        shutil.move(file_path, f"{file_path}.backup")
-            except Exception as e:
-                log(f"Failed to process {file_path}: {e}", "\033[31m", "❌")
+                backend.move(report.path, f"{report.path}.backup")
+            except OSError as e:
+                log(f"Failed to process {report.path}: {e}", "\033[31m", "❌")
+        for line, message in report.unreachable:
+            log(f"Unreachable repository in {report.path} line {line}: {message}", "\033[33m", "⚠️")
+    return True
 
 def display_progress_bar(task_num):
     """Display a progress bar based on the task number."""
@@ -166,72 +229,312 @@ def display_progress_bar(task_num):
     log(f"Overall Progress: {bar} {progress}%", "\033[36m", "⌛")
 
 # Main system tasks
+def plan_system_update(plan):
+    """Queue a package list refresh and a full upgrade."""
+    plan.update()
+    plan.upgrade(full=True)
+
+def plan_system_packages(plan):
+    """Queue the packages the optimizer relies on."""
+    plan.install(*SYSTEM_PACKAGES)
+
+def plan_kernel_cleanup(plan):
+    """Queue purge of kernels other than the running and newest fallback one, plus unused packages."""
+    try:
+        plan.purge(*old_kernel_packages(keep=KEEP_KERNELS))
+    except OSError as e:
+        log(f"Could not read the dpkg database: {e}", "\033[31m", "❌")
+    plan.autoremove(purge=True)
+
+def plan_system_cleanup(plan):
+    """Queue removal of packages that are no longer needed, and purge of configuration left by removed ones."""
+    try:
+        plan.purge(*residual_config_packages())
+    except OSError as e:
+        log(f"Could not read the dpkg database: {e}", "\033[31m", "❌")
+    plan.autoremove()
+
+def run_apt_plan(*planners):
+    """Gather apt intents from ``planners`` and run them as the fewest apt-get transactions."""
+    plan = AptPlan()
+    for planner in planners:
+        planner(plan)
+    backend.note_apt_plan(plan)
+    transactions = plan.transactions()
+    if not transactions:
+        log("All requested packages are already installed.", "\033[32m", "✅")
+        return True
+    success = True
+    for label, argv in transactions:
+        success = run_command_with_options(["sudo"] + argv,
+                                           f"{label} completed.",
+                                           f"{label} failed.", retry=True, force_remove=True, auto_install=True,
+                                           cleanup_sources=argv[-1] == "update") and success
+    return success
+
 def update_system():
     """Update the package list and upgrade all installed packages."""
-    run_command_with_options("sudo apt update",
-                             "Package list updated.",
-                             "Failed to update package list.", retry=True, force_remove=True, auto_install=True, cleanup_sources=True)
-    run_command_with_options("sudo apt upgrade -y",
-                             "System upgraded with latest packages.",
-                             "Failed to upgrade the system.", retry=True, force_remove=True, auto_install=True)
-    run_command_with_options("sudo apt full-upgrade -y",
-                             "Full system upgrade completed.",
-                             "Failed to complete full system upgrade.", retry=True, force_remove=True, auto_install=True)
+    return run_apt_plan(plan_system_update)
 
 def install_system_packages():
     """Install necessary system packages for optimization."""
-    run_command_with_options("sudo apt install -y cpufrequtils thermald tlp tlp-rdw ufw build-essential git curl wget htop net-tools",
-                             "System packages installed.",
-                             "Failed to install system packages.", retry=True, force_remove=True, auto_install=True)
+    return run_apt_plan(plan_system_packages)
 
 def clean_old_kernels():
     """Clean up old kernels to free up disk space."""
-    run_command_with_options("sudo apt autoremove --purge -y",
-                             "Old kernels removed.",
-                             "Failed to remove old kernels.", retry=True, force_remove=True, auto_install=True)
+    return run_apt_plan(plan_kernel_cleanup)
+
+def set_cpu_governor():
+    """Switch the CPU frequency governor to performance."""
+    return run_command_with_options(["sudo", "cpupower", "frequency-set", "-g", "performance"],
+                                    "CPU set to performance mode.",
+                                    "Failed to set CPU to performance mode.", retry=True, force_remove=True, auto_install=True)
+
+def enable_thermal_management():
+    """Enable and start thermald."""
+    return run_command_with_options(["sudo", "systemctl", "enable", "--now", "thermald"],
+                                    "Thermal management enabled.",
+                                    "Failed to enable/start thermal management.", retry=True, force_remove=True, auto_install=True)
+
+def enable_power_management():
+    """Enable and start tlp."""
+    return run_command_with_options(["sudo", "systemctl", "enable", "--now", "tlp"],
+                                    "Power management enabled.",
+                                    "Failed to enable/start power management.", retry=True, force_remove=True, auto_install=True)
 
 def optimize_system():
     """Optimize the system for performance."""
-    run_command_with_options("sudo cpupower frequency-set -g performance",
-                             "CPU set to performance mode.",
-                             "Failed to set CPU to performance mode.", retry=True, force_remove=True, auto_install=True)
-    run_command_with_options("sudo systemctl enable thermald && sudo systemctl start thermald",
-                             "Thermal management enabled.",
-                             "Failed to enable/start thermal management.", retry=True, force_remove=True, auto_install=True)
-    run_command_with_options("sudo systemctl enable tlp && sudo systemctl start tlp",
-                             "Power management enabled.",
-                             "Failed to enable/start power management.", retry=True, force_remove=True, auto_install=True)
+    return all([set_cpu_governor(), enable_thermal_management(), enable_power_management()])
+
+def enable_firewall():
+    """Enable the UFW firewall."""
+    return run_command_with_options(["sudo", "ufw", "--force", "enable"],
+                                    "UFW firewall enabled.",
+                                    "Failed to enable UFW firewall.", retry=True, force_remove=True, auto_install=True)
+
+def deny_incoming_traffic():
+    """Set the default UFW policy for incoming traffic to deny."""
+    return run_command_with_options(["sudo", "ufw", "default", "deny", "incoming"],
+                                    "Default deny policy for incoming traffic set.",
+                                    "Failed to set deny policy for incoming traffic.", retry=True, force_remove=True, auto_install=True)
+
+def allow_outgoing_traffic():
+    """Set the default UFW policy for outgoing traffic to allow."""
+    return run_command_with_options(["sudo", "ufw", "default", "allow", "outgoing"],
+                                    "Default allow policy for outgoing traffic set.",
+                                    "Failed to set allow policy for outgoing traffic.", retry=True, force_remove=True, auto_install=True)
+
+def allow_ssh():
+    """Allow SSH through the firewall."""
+    return run_command_with_options(["sudo", "ufw", "allow", "ssh"],
+                                    "SSH allowed through firewall.",
+                                    "Failed to allow SSH through firewall.", retry=True, force_remove=True, auto_install=True)
 
 def enhance_security():
     """Enhance system security."""
-    run_command_with_options("sudo ufw enable",
-                             "UFW firewall enabled.",
-                             "Failed to enable UFW firewall.", retry=True, force_remove=True, auto_install=True)
-    run_command_with_options("sudo ufw default deny incoming",
-                             "Default deny policy for incoming traffic set.",
-                             "Failed to set deny policy for incoming traffic.", retry=True, force_remove=True, auto_install=True)
-    run_command_with_options("sudo ufw default allow outgoing",
-                             "Default allow policy for outgoing traffic set.",
-                             "Failed to set allow policy for outgoing traffic.", retry=True, force_remove=True, auto_install=True)
-    run_command_with_options("sudo ufw allow ssh",
-                             "SSH allowed through firewall.",
-                             "Failed to allow SSH through firewall.", retry=True, force_remove=True, auto_install=True)
+    return all([enable_firewall(), deny_incoming_traffic(), allow_outgoing_traffic(), allow_ssh()])
+
+def apply_tuning(profile, success_msg, error_msg, persist=False):
+    """Apply a tuning profile (name or settings dict) in one verified batch, rolling back on failure."""
+    try:
+        settings, skipped = backend.apply_profile(profile, persist=persist)
+    except ProfileError as e:
+        log(f"{error_msg} Rolled back: {e}", "\033[31m", "❌")
+        return False
+    for setting in skipped:
+        log(f"Skipped {setting}: not supported on this system.", "\033[33m", "ℹ️")
+    log(f"{success_msg} ({len(settings)} settings verified)", "\033[32m", "✅")
+    return True
 
 def configure_swap():
     """Optimize and configure swap space."""
-    run_command_with_options("sudo sysctl vm.swappiness=10",
-                             "Swappiness set to 10.",
-                             "Failed to set swappiness.", retry=True, force_remove=True, auto_install=True)
-    run_command_with_options("sudo sysctl vm.vfs_cache_pressure=50",
-                             "VFS cache pressure set to 50.",
-                             "Failed to set VFS cache pressure.", retry=True, force_remove=True, auto_install=True)
+    return apply_tuning({"sysctl": SWAP_SETTINGS},
+                        "Swappiness set to 10 and VFS cache pressure set to 50.",
+                        "Failed to configure swap settings.")
+
+def tune_sysctl(key):
+    """Apply one of the swap settings on its own, so its effect can be measured separately."""
+    return apply_tuning({"sysctl": {key: SWAP_SETTINGS[key]}},
+                        f"{key} set to {SWAP_SETTINGS[key]}.",
+                        f"Failed to set {key}.")
+
+def apply_profile():
+    """Ask for a workload profile and apply, verify and persist it."""
+    print("\nAvailable profiles: " + ", ".join(PROFILES))
+    name = input("Enter a profile name: ").strip()
+    if name not in PROFILES:
+        log(f"Unknown profile: {name}", "\033[31m", "❌")
+        return False
+    return apply_tuning(name, f"Profile {name} applied and persisted.", f"Failed to apply profile {name}.", persist=True)
+
+def rollback_profile():
+    """Restore the settings saved before the first applied profile; having none to restore is not a failure."""
+    try:
+        restored = backend.rollback_profile()
+    except ProfileError as e:
+        log(f"Failed to roll back profile: {e}", "\033[31m", "❌")
+        return False
+    if restored:
+        log("Previous tuning restored.", "\033[32m", "✅")
+    else:
+        log("No applied profile to roll back.", "\033[33m", "ℹ️")
+    return True
 
 def clean_system():
     """Clean up unnecessary packages and files."""
-    run_command_with_options("sudo apt autoremove -y",
-                             "System cleaned up.",
-                             "Failed to clean up the system.", retry=True, force_remove=True, auto_install=True)
-    delete_virtualenv()
+    return run_apt_plan(plan_system_cleanup)
+
+# Benchmarks
+def benchmark_tuning_steps():
+    """Benchmark the system before and after each tuning step and save a JSON report."""
+    steps = []
+    for label, action in (("cpu-governor", set_cpu_governor),
+                          ("thermald", enable_thermal_management),
+                          ("tlp", enable_power_management),
+                          ("swappiness", lambda: tune_sysctl("vm.swappiness")),
+                          ("vfs-cache-pressure", lambda: tune_sysctl("vm.vfs_cache_pressure"))):
+        log(f"Benchmarking {label}...", "\033[34m", "📏")
+        record = benchmark_step(label, action)
+        for name, result in record["comparison"].items():
+            verdict = "significant" if result["significant"] else "within noise"
+            log(f"  {name:<16} {result['before_median'] * 1000:9.3f}ms → {result['after_median'] * 1000:9.3f}ms "
+                f"({result['change_pct']:+.1f}%, {verdict})", "\033[36m", "•")
+        steps.append(record)
+    path = save_report(steps, extra={"os": os_release().get("PRETTY_NAME")})
+    log(f"Benchmark report saved to {path}.", "\033[32m", "✅")
+    return path
+
+# Full optimization
+def build_full_optimization_graph():
+    """Build the task graph for "Full Optimization".
+
+    All apt work is merged into one planned "apt" step; steps that need the
+    packages it installs wait for it; sysctl and governor changes have no
+    prerequisites and start right away.
+    """
+    graph = TaskGraph()
+    graph.add("apt", lambda: run_apt_plan(plan_system_update, plan_system_packages,
+                                          plan_kernel_cleanup, plan_system_cleanup),
+              resources=("apt", "network"))
+
+    graph.add("cpu-governor", set_cpu_governor)
+    graph.add("thermald", enable_thermal_management, requires=("apt",))
+    graph.add("tlp", enable_power_management, requires=("apt",))
+
+    graph.add("ufw-enable", enable_firewall, requires=("apt",), resources=("ufw",))
+    graph.add("ufw-deny-incoming", deny_incoming_traffic, requires=("ufw-enable",), resources=("ufw",))
+    graph.add("ufw-allow-outgoing", allow_outgoing_traffic, requires=("ufw-enable",), resources=("ufw",))
+    graph.add("ufw-allow-ssh", allow_ssh, requires=("ufw-enable",), resources=("ufw",))
+
+    graph.add("swap", configure_swap)
+    return graph
+
+def report_schedule(graph, results):
+    """Log per-task timings and the critical path of a finished graph run."""
+    log("Task timings:", "\033[36m", "⏱️")
+    for result in sorted(results.values(), key=lambda r: r.started):
+        status = "ok" if result.success else "failed"
+        log(f"  {result.name:<20} {result.duration:7.2f}s  {status}", "\033[36m" if result.success else "\033[31m", "•")
+    path, total = graph.critical_path(results)
+    if results:
+        wall_time = max(r.finished for r in results.values()) - min(r.started for r in results.values())
+        log(f"Critical path ({total:.2f}s): {' -> '.join(path)}", "\033[36m", "🛤️")
+        log(f"Wall-clock time: {wall_time:.2f}s", "\033[36m", "⌛")
+
+def run_full_optimization(max_workers=MAX_WORKERS):
+    """Run every optimizer task, executing independent steps concurrently."""
+    graph = build_full_optimization_graph()
+    results = graph.run(max_workers=max_workers)
+    report_schedule(graph, results)
+    record_timings(results)
+    return all(result.success for result in results.values())
+
+# Dry run
+def build_plan():
+    """Record what "Full Optimization" would do and estimate its cost, without changing anything.
+
+    Returns a dict with ``tasks`` (name, expected seconds or None, recorded
+    operations), ``download``/``freed`` bytes, the expected ``duration``
+    along ``critical_path`` and the ``sources`` files with problems (mirrors
+    are probed only with ``PROBE_MIRRORS``).
+    """
+    global backend, log_handler
+    recorder = RecordingBackend()
+    graph = build_full_optimization_graph()
+    # Recorded tasks "succeed" without doing anything, so their messages are silenced too
+    previous, backend = backend, recorder
+    previous_handler, log_handler = log_handler, None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, task in graph.tasks.items():
+                recorder.task = name
+                task.action()
+    finally:
+        backend = previous
+        log_handler = previous_handler
+
+    history = load_timings()
+    estimates = {name: expected_duration(name, history) for name in graph.tasks}
+    download = freed = 0
+    for apt_plan in recorder.apt_plans:
+        plan_download, plan_freed = estimate_apt(apt_plan)
+        download += plan_download
+        freed += plan_freed
+    timed = {name: TaskResult(name, True, 0.0, duration or 0.0) for name, duration in estimates.items()}
+    path, total = graph.critical_path(timed)
+    try:
+        reports = validate_sources(cache_file=None, probe=PROBE_MIRRORS, base_url=MIRROR_BASE_URL)
+    except OSError:
+        reports = []
+    return {
+        "tasks": [{"name": name, "expected": estimates[name],
+                   "operations": [op for op in recorder.operations if op["task"] == name]} for name in graph.tasks],
+        "download": download,
+        "freed": freed,
+        "duration": total,
+        "critical_path": path,
+        "sources": [{"path": report.path, "errors": report.errors, "unreachable": report.unreachable,
+                     "read_error": report.read_error} for report in reports if not report.valid or report.unreachable],
+    }
+
+def plan_full_optimization():
+    """Print what "Full Optimization" would do and what it would cost, without changing anything."""
+    plan = build_plan()
+    print("\nPlan for Full Optimization (nothing will be changed):")
+    for task in plan["tasks"]:
+        expected = f"~{task['expected']:.1f}s" if task["expected"] is not None else "no timing history"
+        print(f"\n[{task['name']}] ({expected})")
+        if not task["operations"]:
+            print("    (no changes)")
+        for op in task["operations"]:
+            if op["kind"] == "command":
+                print(f"    $ {shlex.join(op['argv'])}")
+            elif op["kind"] == "setting":
+                print(f"    set {op['path']}: {op['old']} -> {op['new']}")
+            elif op["kind"] == "write":
+                print(f"    write {op['path']} ({op['bytes']} bytes)")
+            elif op["kind"] in ("copy", "move"):
+                print(f"    {op['kind']} {op['src']} -> {op['dst']}")
+            elif op["kind"] == "remove":
+                print(f"    remove {op['path']}")
+
+    if plan["sources"]:
+        print("\nPackage sources:")
+    for source in plan["sources"]:
+        if source["read_error"]:
+            print(f"    {source['path']}: unreadable ({source['read_error']}), would be left in place")
+        for line, message in source["errors"]:
+            print(f"    {source['path']} line {line}: {message} (file would be moved to a backup)")
+        for line, message in source["unreachable"]:
+            print(f"    {source['path']} line {line}: unreachable ({message})")
+
+    unknown = [task["name"] for task in plan["tasks"] if task["expected"] is None]
+    print("\nEstimated cost:")
+    print(f"    Download size: {format_bytes(plan['download'])}")
+    print(f"    Disk freed (explicit purges): {format_bytes(plan['freed'])}")
+    print(f"    Expected duration: {plan['duration']:.1f}s along {' -> '.join(plan['critical_path'])}")
+    if unknown:
+        print(f"    No timing history yet for: {', '.join(unknown)}")
 
 # User interaction
 def display_menu():
@@ -245,7 +548,10 @@ def display_menu():
         "6": "Configure Swap Space",
         "7": "Clean System",
         "8": "Full Optimization (All Tasks)",
-        "9": "Exit"
+        "9": "Exit",
+        "10": "Benchmark Tuning Steps",
+        "11": "Apply Tuning Profile",
+        "12": "Roll Back Tuning Profile"
     }
     print("\nPlease choose an action:")
     for key, value in menu_options.items():
@@ -254,13 +560,11 @@ def display_menu():
 
 def main():
     ensure_ubuntu()
+    ensure_sudo()
+    metrics_sampler.start()
     user_name = prompt_user_name()
     task_num = 0
 
-    create_virtualenv()
-    task_num += 1
-    display_progress_bar(task_num)
-
     while True:
         choice = display_menu()
         if choice == "1":
@@ -278,24 +582,38 @@ def main():
         elif choice == "7":
             clean_system()
         elif choice == "8":
-            update_system()
-            install_system_packages()
-            clean_old_kernels()
-            optimize_system()
-            enhance_security()
-            configure_swap()
-            clean_system()
+            run_full_optimization()
             break
         elif choice == "9":
             log("Exiting script. Goodbye!", "\033[34m", "👋")
             break
+        elif choice == "10":
+            benchmark_tuning_steps()
+        elif choice == "11":
+            apply_profile()
+        elif choice == "12":
+            rollback_profile()
         else:
             log("Invalid choice. Please try again.", "\033[31m", "❌")
 
         task_num += 1
         display_progress_bar(task_num)
 
+    metrics_sampler.stop()
     log("🚀 System is fully optimized, secure, and clean!", "\033[32m", "🚀")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="UbuntuBoost system optimizer")
+    parser.add_argument("--plan", action="store_true",
+                        help="print what Full Optimization would do and its estimated cost, without changing anything")
+    parser.add_argument("--probe-mirrors", action="store_true",
+                        help="check that every sources.list.d mirror answers when validating package sources")
+    parser.add_argument("--mirror-base-url", metavar="URL",
+                        help="send mirror probes to this server instead of the real mirrors")
+    args = parser.parse_args()
+    PROBE_MIRRORS = args.probe_mirrors
+    MIRROR_BASE_URL = args.mirror_base_url
+    if args.plan:
+        plan_full_optimization()
+    else:
+        main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Cost estimates for dry runs: download size, disk freed and expected duration."""
+import glob
+import json
+import os
+import statistics
+
+try:
+    from .dpkg import DPKG_STATUS, compare_versions, iter_status_records, load_status, load_cached
+except ImportError:
+    from dpkg import DPKG_STATUS, compare_versions, iter_status_records, load_status, load_cached
+
+APT_LISTS = "/var/lib/apt/lists"
+TIMINGS_FILE = "/var/lib/ubuntuboost/timings.json"
+TIMINGS_KEPT = 20   # Most recent runs remembered per task
+
+
+def _load_index(path):
+    """Return ``{package: (version, size)}`` for one apt Packages index."""
+    packages = {}
+    for record in iter_status_records(path):
+        name, version = record.get("Package"), record.get("Version")
+        if name and version and (name not in packages or compare_versions(version, packages[name][0]) > 0):
+            packages[name] = (version, int(record.get("Size", 0) or 0))
+    return packages
+
+
+def candidate_versions(lists_dir=APT_LISTS):
+    """Return ``{package: (version, download size)}`` of the newest version in apt's cached indexes."""
+    candidates = {}
+    for path in glob.glob(os.path.join(lists_dir, "*_Packages")):
+        try:
+            index = load_cached(path, _load_index)
+        except OSError:
+            continue
+        for name, (version, size) in index.items():
+            current = candidates.get(name)
+            if current is None or compare_versions(version, current[0]) > 0:
+                candidates[name] = (version, size)
+    return candidates
+
+
+def estimate_apt(plan, status_path=DPKG_STATUS, lists_dir=APT_LISTS):
+    """Estimate bytes to download and bytes freed for an ``AptPlan``.
+
+    Autoremove cannot be sized without apt's resolver, so only explicit
+    purges count towards the space freed.
+    """
+    try:
+        index = load_status(status_path)
+    except OSError:
+        index = None
+    installed = index.installed_versions() if index else {}
+    candidates = candidate_versions(lists_dir)
+
+    download = 0
+    wanted = set()
+    for spec in plan.pending_installs(installed):
+        name = spec.split("=", 1)[0]
+        wanted.add(name)
+        download += candidates.get(name, (None, 0))[1]
+    if plan.upgrade_mode:
+        for name, version in installed.items():
+            candidate = candidates.get(name)
+            if name not in wanted and candidate and compare_versions(candidate[0], version) > 0:
+                download += candidate[1]
+
+    freed = 0
+    for name in plan.purges:
+        for package in index.get(name) if index else ():
+            freed += int(package.fields.get("Installed-Size", 0) or 0) * 1024
+    return download, freed
+
+
+# Historical timings
+def load_timings(path=TIMINGS_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_timings(results, path=TIMINGS_FILE):
+    """Append the durations of a finished graph run to the timing history."""
+    history = load_timings(path)
+    for name, result in results.items():
+        history[name] = (history.get(name, []) + [round(result.duration, 3)])[-TIMINGS_KEPT:]
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(history, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def expected_duration(task, history):
+    """Median of the recorded durations of ``task``, or None if it never ran."""
+    samples = history.get(task)
+    return statistics.median(samples) if samples else None
+
+
+def format_bytes(size):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
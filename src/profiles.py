@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Workload tuning profiles applied through /proc/sys and /sys, with verify and rollback."""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+
+SYSCTL_CONF = "etc/sysctl.d/60-ubuntuboost.conf"
+SNAPSHOT_FILE = "var/lib/ubuntuboost/profile-snapshot.json"
+
+# Each profile sets sysctls plus optional CPU governor, block I/O scheduler and
+# transparent huge page mode. Settings the running kernel does not offer are skipped.
+PROFILES = {
+    "database": {
+        "sysctl": {
+            "vm.swappiness": 1,
+            "vm.dirty_ratio": 15,
+            "vm.dirty_background_ratio": 5,
+            "kernel.sched_autogroup_enabled": 0,
+            "net.core.somaxconn": 4096,
+        },
+        "governor": "performance",
+        "io_scheduler": "mq-deadline",
+        "thp": "never",
+    },
+    "build-server": {
+        "sysctl": {
+            "vm.swappiness": 10,
+            "vm.vfs_cache_pressure": 50,
+            "fs.inotify.max_user_watches": 524288,
+            "fs.file-max": 2097152,
+        },
+        "governor": "performance",
+        "io_scheduler": "mq-deadline",
+        "thp": "madvise",
+    },
+    "desktop": {
+        "sysctl": {
+            "vm.swappiness": 10,
+            "vm.vfs_cache_pressure": 50,
+            "kernel.sched_autogroup_enabled": 1,
+            "fs.inotify.max_user_watches": 524288,
+        },
+        "governor": "schedutil",
+        "io_scheduler": "bfq",
+        "thp": "madvise",
+    },
+    "low-latency": {
+        "sysctl": {
+            "vm.swappiness": 1,
+            "vm.stat_interval": 10,
+            "kernel.timer_migration": 0,
+            "net.core.busy_poll": 50,
+            "net.core.busy_read": 50,
+        },
+        "governor": "performance",
+        "io_scheduler": "none",
+        "thp": "never",
+    },
+}
+
+
+class ProfileError(Exception):
+    """Raised when a profile cannot be applied; the system has been rolled back when this is raised."""
+
+
+def _normalize(text):
+    """Collapse whitespace, and reduce selector files like ``[mq-deadline] none`` to the selected entry."""
+    selected = re.search(r"\[([^\]]+)\]", text)
+    return selected.group(1) if selected else " ".join(str(text).split())
+
+
+def _read(path):
+    with open(path, "r") as f:
+        return f.read()
+
+
+class ProfileEngine:
+    """Apply settings under ``root`` (``/`` on a real host, a fake tree in tests)."""
+
+    def __init__(self, root="/"):
+        self.root = root
+
+    def _path(self, relative):
+        return os.path.join(self.root, relative)
+
+    def sysctl_path(self, key):
+        return self._path(os.path.join("proc", "sys", *key.split(".")))
+
+    def settings(self, profile):
+        """Resolve ``profile`` (a name or dict) to ``({path: value}, [skipped])`` for this host."""
+        if isinstance(profile, str):
+            if profile not in PROFILES:
+                raise ProfileError(f"Unknown profile: {profile}. Available: {', '.join(PROFILES)}")
+            profile = PROFILES[profile]
+        settings, skipped = {}, []
+
+        for key, value in profile.get("sysctl", {}).items():
+            path = self.sysctl_path(key)
+            if os.path.exists(path):
+                settings[path] = str(value)
+            else:
+                skipped.append(key)
+
+        governor = profile.get("governor")
+        if governor:
+            for path in sorted(glob.glob(self._path("sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_governor"))):
+                available = os.path.join(os.path.dirname(path), "scaling_available_governors")
+                if not os.path.exists(available) or governor in _read(available).split():
+                    settings[path] = governor
+                else:
+                    skipped.append(f"governor:{path}")
+
+        scheduler = profile.get("io_scheduler")
+        if scheduler:
+            for path in sorted(glob.glob(self._path("sys/block/*/queue/scheduler"))):
+                if scheduler in _read(path).replace("[", " ").replace("]", " ").split():
+                    settings[path] = scheduler
+                else:
+                    skipped.append(f"io_scheduler:{path}")
+
+        thp = profile.get("thp")
+        if thp:
+            path = self._path("sys/kernel/mm/transparent_hugepage/enabled")
+            if os.path.exists(path):
+                settings[path] = thp
+            else:
+                skipped.append("thp")
+        return settings, skipped
+
+    def snapshot(self, paths):
+        """Return the current value of every path, plus the persisted sysctl file."""
+        values = {path: _normalize(_read(path)) for path in paths}
+        conf = self._path(SYSCTL_CONF)
+        return {"values": values, "sysctl_conf": _read(conf) if os.path.exists(conf) else None}
+
+    def write(self, settings):
+        """Write every setting; return ``{path: error}`` for the ones that failed."""
+        errors = {}
+        for path, value in settings.items():
+            try:
+                with open(path, "w") as f:
+                    f.write(str(value))
+            except OSError as e:
+                errors[path] = str(e)
+        return errors
+
+    def verify(self, settings):
+        """Read every setting back; return ``{path: (wanted, actual)}`` for mismatches."""
+        mismatches = {}
+        for path, value in settings.items():
+            try:
+                actual = _normalize(_read(path))
+            except OSError as e:
+                actual = f"unreadable: {e}"
+            if actual != _normalize(str(value)):
+                mismatches[path] = (str(value), actual)
+        return mismatches
+
+    def persist(self, profile, settings):
+        """Write the sysctl part of ``settings`` to sysctl.d so it survives a reboot."""
+        sysctl_root = self.sysctl_path("")
+        lines = [f"# Written by UbuntuBoost profile: {profile}"]
+        for path, value in settings.items():
+            if path.startswith(sysctl_root):
+                key = os.path.relpath(path, sysctl_root).replace(os.sep, ".")
+                lines.append(f"{key} = {value}")
+        self._write_atomic(self._path(SYSCTL_CONF), "\n".join(lines) + "\n")
+
+    def _write_atomic(self, path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    def save_snapshot(self, snapshot):
+        self._write_atomic(self._path(SNAPSHOT_FILE), json.dumps(snapshot, indent=2))
+
+    def load_snapshot(self):
+        path = self._path(SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def restore(self, snapshot):
+        """Put every value and the sysctl.d file back as they were in ``snapshot``."""
+        errors = self.write(snapshot["values"])
+        conf = self._path(SYSCTL_CONF)
+        if snapshot["sysctl_conf"] is None:
+            if os.path.exists(conf):
+                os.remove(conf)
+        else:
+            self._write_atomic(conf, snapshot["sysctl_conf"])
+        return errors
+
+    def apply(self, profile, persist=True):
+        """Apply a profile as one batch, verify it and persist it; roll everything back on any failure.
+
+        Only persisted applies save a snapshot for a later ``rollback()``. The
+        snapshot keeps the values from before the first persisted profile, so
+        applying several profiles in a row still rolls back to the original
+        state. Returns ``(applied settings, skipped settings)``; raises
+        ``ProfileError`` after rolling back.
+        """
+        try:
+            settings, skipped = self.settings(profile)
+            snapshot = self.snapshot(settings)
+        except OSError as e:
+            raise ProfileError(f"Could not read current settings: {e}")
+        errors = self.write(settings)
+        mismatches = self.verify(settings) if not errors else {}
+        if errors or mismatches:
+            self.restore(snapshot)
+            details = errors or {path: f"wanted {wanted}, got {actual}" for path, (wanted, actual) in mismatches.items()}
+            raise ProfileError("; ".join(f"{path}: {detail}" for path, detail in details.items()))
+        if persist:
+            name = profile if isinstance(profile, str) else "custom"
+            try:
+                original = self.load_snapshot()
+                self.persist(name, settings)
+                if original:
+                    # Paths this profile touches for the first time are added; known ones keep their original value
+                    original = dict(original, values={**snapshot["values"], **original["values"]}, profile=name)
+                self.save_snapshot(original or dict(snapshot, profile=name))
+            except (OSError, ValueError) as e:
+                self.restore(snapshot)
+                raise ProfileError(f"Could not persist {name}: {e}")
+        return settings, skipped
+
+    def rollback(self):
+        """Restore the state saved before the first applied profile; return False if there is none."""
+        try:
+            snapshot = self.load_snapshot()
+        except (OSError, ValueError) as e:
+            raise ProfileError(f"Could not read the profile snapshot: {e}")
+        if not snapshot:
+            return False
+        errors = self.restore(snapshot)
+        if errors:
+            raise ProfileError("; ".join(f"{path}: {error}" for path, error in errors.items()))
+        os.remove(self._path(SNAPSHOT_FILE))
+        return True
+
+
+def main(argv=None):
+    """Apply or roll back a profile and print the outcome as one JSON object.
+
+    Unprivileged callers run this through sudo, since only root can write
+    /proc/sys and /sys. ``apply`` takes the profile as JSON: a name or a
+    settings dict.
+    """
+    parser = argparse.ArgumentParser(description="Apply or roll back a UbuntuBoost tuning profile")
+    actions = parser.add_subparsers(dest="action", required=True)
+    apply_parser = actions.add_parser("apply")
+    apply_parser.add_argument("profile", help='JSON profile, e.g. \'"database"\' or \'{"sysctl": {"vm.swappiness": 10}}\'')
+    apply_parser.add_argument("--persist", action="store_true")
+    actions.add_parser("rollback")
+    args = parser.parse_args(argv)
+
+    engine = ProfileEngine()
+    try:
+        if args.action == "apply":
+            settings, skipped = engine.apply(json.loads(args.profile), persist=args.persist)
+            reply = {"settings": settings, "skipped": skipped}
+        else:
+            reply = {"restored": engine.rollback()}
+    except (ProfileError, ValueError) as e:
+        print(json.dumps({"error": str(e)}))
+        return 1
+    print(json.dumps(reply))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Classify command failures and decide how (and whether) to retry them."""
+import random
+import re
+
+# Failure kinds
+DPKG_LOCK = "dpkg-lock"
+DPKG_INTERRUPTED = "dpkg-interrupted"
+MIRROR = "mirror"
+NETWORK = "network"
+BROKEN_DEPS = "broken-deps"
+TIMEOUT = "timeout"
+MISSING_COMMAND = "missing-command"
+UNKNOWN = "unknown"
+
+# Checked in order against stderr (then stdout); the first match wins.
+PATTERNS = [
+    (DPKG_LOCK, re.compile(r"Could not get lock|Unable to acquire the dpkg frontend lock|"
+                           r"Unable to lock the administration directory|is another process using it", re.I)),
+    (DPKG_INTERRUPTED, re.compile(r"dpkg was interrupted|dpkg --configure -a", re.I)),
+    (MIRROR, re.compile(r"404\s+Not Found|does not have a Release file|no longer has a Release file|"
+                        r"NO_PUBKEY|is not signed|Malformed entry|Type '.*' is not known", re.I)),
+    (NETWORK, re.compile(r"Temporary failure resolving|Could not resolve|Name or service not known|"
+                         r"Network is unreachable|Connection timed out|Connection refused|Could not connect to|"
+                         r"Connection failed", re.I)),
+    (BROKEN_DEPS, re.compile(r"Unmet dependencies|held broken packages|--fix-broken|dependency problems|"
+                             r"Depends: .* but it is not", re.I)),
+]
+
+
+class RetryRule:
+    """How many attempts a failure kind gets, how long to back off, and what to fix in between."""
+
+    def __init__(self, max_attempts, base_delay=0.0, max_delay=0.0, remediation=()):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.remediation = tuple(remediation)
+
+
+# Transient kinds back off and retry without touching the system; structural
+# kinds get one targeted fix and a single retry.
+RULES = {
+    DPKG_LOCK: RetryRule(8, base_delay=5, max_delay=120),
+    NETWORK: RetryRule(5, base_delay=2, max_delay=60),
+    TIMEOUT: RetryRule(3, base_delay=5, max_delay=60),
+    DPKG_INTERRUPTED: RetryRule(2, remediation=("configure_pending",)),
+    MIRROR: RetryRule(2, remediation=("validate_sources", "regenerate_sources")),
+    BROKEN_DEPS: RetryRule(2, remediation=("fix_broken",)),
+    MISSING_COMMAND: RetryRule(1),
+    UNKNOWN: RetryRule(2, base_delay=1, max_delay=10),
+}
+
+
+def classify(result):
+    """Return the failure kind of a failed ``CommandResult``."""
+    if result.timed_out:
+        return TIMEOUT
+    if result.returncode == 127:
+        return MISSING_COMMAND
+    for text in ("\n".join(result.stderr), "\n".join(result.stdout)):
+        for kind, pattern in PATTERNS:
+            if pattern.search(text):
+                return kind
+    return UNKNOWN
+
+
+def backoff_delay(rule, attempt, rng=random):
+    """Exponential backoff with jitter for the ``attempt``-th failure (1-based).
+
+    Half of the exponential delay is fixed and half is random, so hosts that
+    failed together spread out instead of retrying against a mirror in lockstep.
+    """
+    if not rule.base_delay:
+        return 0.0
+    delay = min(rule.max_delay, rule.base_delay * 2 ** (attempt - 1))
+    return delay / 2 + rng.uniform(0, delay / 2)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Dependency-aware task graph used to run optimizer steps concurrently."""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+MAX_WORKERS = 4
+
+
+class Task:
+    """A named unit of work with ordering requirements and exclusive resources."""
+
+    def __init__(self, name, action, requires=(), resources=()):
+        self.name = name
+        self.action = action
+        self.requires = tuple(requires)
+        self.resources = frozenset(resources)
+
+
+class TaskResult:
+    """Outcome and timing of a single task run."""
+
+    def __init__(self, name, success, started, finished, error=None):
+        self.name = name
+        self.success = success
+        self.started = started
+        self.finished = finished
+        self.error = error
+
+    @property
+    def duration(self):
+        return self.finished - self.started
+
+
+class TaskGraph:
+    """Run tasks on a worker pool once their requirements are met.
+
+    ``requires`` lists tasks that must have finished first; ``resources`` names
+    exclusive locks (for example ``"apt"`` or ``"ufw"``) that no two running
+    tasks may hold at the same time. A failed task does not stop its
+    dependents, matching the optimizer's "proceed to the next task" behaviour.
+    """
+
+    def __init__(self):
+        self.tasks = {}
+
+    def add(self, name, action, requires=(), resources=()):
+        """Register a task. Requirements must already be registered, which keeps the graph acyclic."""
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        missing = [dep for dep in requires if dep not in self.tasks]
+        if missing:
+            raise ValueError(f"Task {name} requires unknown task(s): {', '.join(missing)}")
+        self.tasks[name] = Task(name, action, requires, resources)
+        return self.tasks[name]
+
+    def _execute(self, task):
+        started = time.time()
+        try:
+            success = task.action() is not False
+            error = None
+        except Exception as e:
+            success = False
+            error = e
+        return TaskResult(task.name, success, started, time.time(), error)
+
+    def _is_ready(self, task, results, held):
+        return all(dep in results for dep in task.requires) and not (task.resources & held)
+
+    def run(self, max_workers=MAX_WORKERS):
+        """Run every task and return a dict of ``TaskResult`` keyed by task name."""
+        results = {}
+        pending = list(self.tasks)
+        running = {}
+        held = set()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while pending or running:
+                for name in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    task = self.tasks[name]
+                    if not self._is_ready(task, results, held):
+                        continue
+                    held.update(task.resources)
+                    pending.remove(name)
+                    running[pool.submit(self._execute, task)] = task
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    results[task.name] = future.result()
+                    held.difference_update(task.resources)
+        return results
+
+    def critical_path(self, results):
+        """Return the chain of tasks with the longest total duration and that duration.
+
+        A task waits for its ``requires`` and also for every task holding one
+        of its resources that ran before it, so both count as edges. Tasks are
+        taken in start order, ties broken by registration order (which is the
+        order the scheduler tries them in, and the only order available when
+        ``results`` are estimates that all start at 0).
+        """
+        rank = {name: index for index, name in enumerate(self.tasks)}
+        order = sorted((name for name in self.tasks if name in results),
+                       key=lambda name: (results[name].started, rank[name]))
+        finish = {}
+        previous = {}
+        for name in order:
+            task = self.tasks[name]
+            before = set(dep for dep in task.requires if dep in finish)
+            before.update(other for other in finish if self.tasks[other].resources & task.resources)
+            longest_dep = max(sorted(before), key=finish.get, default=None)
+            previous[name] = longest_dep
+            finish[name] = results[name].duration + (finish[longest_dep] if longest_dep else 0.0)
+
+        if not finish:
+            return [], 0.0
+        name = max(finish, key=finish.get)
+        total = finish[name]
+        path = []
+        while name:
+            path.append(name)
+            name = previous[name]
+        return list(reversed(path)), total
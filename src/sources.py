@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Validate apt source files (one-line .list and deb822 .sources) concurrently and incrementally."""
+import hashlib
+import http.client
+import json
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+
+SOURCES_DIR = "/etc/apt/sources.list.d"
+CACHE_FILE = "/var/cache/ubuntuboost/sources-cache.json"
+MAX_WORKERS = 8
+PROBE_TIMEOUT = 10
+POOL_SIZE = 4          # Kept-alive connections per mirror host
+
+SOURCE_TYPES = ("deb", "deb-src")
+URI_PATTERN = re.compile(r"^[a-z][a-z0-9+.-]*:(//)?\S+$")
+
+
+class SourceEntry:
+    """One repository line or deb822 stanza, expanded per type/URI/suite."""
+
+    def __init__(self, type_, uri, suite, components, line):
+        self.type = type_
+        self.uri = uri.rstrip("/")
+        self.suite = suite
+        self.components = components
+        self.line = line
+
+    def release_urls(self):
+        """Candidate URLs of the signed and unsigned Release files for this entry."""
+        if self.suite.endswith("/"):
+            base = f"{self.uri}/{self.suite}"
+        else:
+            base = f"{self.uri}/dists/{self.suite}/"
+        return [base + "InRelease", base + "Release"]
+
+    def to_dict(self):
+        return {"type": self.type, "uri": self.uri, "suite": self.suite,
+                "components": self.components, "line": self.line}
+
+
+class SourceReport:
+    """Validation result for one file."""
+
+    def __init__(self, path, digest, entries=None, errors=None, cached=False, read_error=None):
+        self.path = path
+        self.digest = digest
+        self.entries = entries or []
+        self.errors = errors or []   # (line number, message)
+        self.unreachable = []        # (line number, message) from mirror probing
+        self.cached = cached
+        self.read_error = read_error  # Set when the file could not be read; its content is unknown
+
+    @property
+    def valid(self):
+        return not self.errors and self.read_error is None
+
+
+# Parsers
+def parse_one_line(text):
+    """Parse the one-line format; return ``(entries, errors)``."""
+    entries, errors = [], []
+    for number, raw in enumerate(text.splitlines(), start=1):
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        options = re.match(r"^(\S+)\s+\[([^\]]*)\]\s*(.*)$", line)
+        if options:
+            type_, rest = options.group(1), options.group(3)
+        else:
+            type_, _, rest = line.partition(" ")
+        fields = rest.split()
+        if type_ not in SOURCE_TYPES:
+            errors.append((number, f"unknown type '{type_}'"))
+        elif len(fields) < 2:
+            errors.append((number, "expected a URI and a suite"))
+        elif not URI_PATTERN.match(fields[0]):
+            errors.append((number, f"invalid URI '{fields[0]}'"))
+        elif not fields[1].endswith("/") and len(fields) < 3:
+            errors.append((number, f"suite '{fields[1]}' needs at least one component"))
+        else:
+            entries.append(SourceEntry(type_, fields[0], fields[1], fields[2:], number))
+    return entries, errors
+
+
+def _deb822_stanzas(text):
+    stanza, start, field = {}, None, None
+    for number, line in enumerate(text.splitlines() + [""], start=1):
+        if line.startswith("#"):
+            continue
+        if not line.strip():
+            if stanza:
+                yield start, stanza
+            stanza, start, field = {}, None, None
+        elif line[0] in " \t":
+            if field:
+                stanza[field] += " " + line.strip()
+        else:
+            field, _, value = line.partition(":")
+            field = field.strip()
+            stanza[field] = value.strip()
+            start = start or number
+
+
+def parse_deb822(text):
+    """Parse the deb822 ``.sources`` format; return ``(entries, errors)``."""
+    entries, errors = [], []
+    for number, stanza in _deb822_stanzas(text):
+        if stanza.get("Enabled", "yes").lower() == "no":
+            continue
+        types, uris, suites = (stanza.get(key, "").split() for key in ("Types", "URIs", "Suites"))
+        components = stanza.get("Components", "").split()
+        missing = [key for key, value in (("Types", types), ("URIs", uris), ("Suites", suites)) if not value]
+        if missing:
+            errors.append((number, f"missing {', '.join(missing)}"))
+            continue
+        stanza_errors = []
+        bad_types = [t for t in types if t not in SOURCE_TYPES]
+        bad_uris = [u for u in uris if not URI_PATTERN.match(u)]
+        if bad_types:
+            stanza_errors.append((number, f"unknown type(s) {', '.join(bad_types)}"))
+        if bad_uris:
+            stanza_errors.append((number, f"invalid URI(s) {', '.join(bad_uris)}"))
+        if not components and not all(suite.endswith("/") for suite in suites):
+            stanza_errors.append((number, "Components is required unless every suite is an exact path"))
+        if stanza_errors:
+            errors.extend(stanza_errors)
+            continue
+        entries.extend(SourceEntry(t, u, s, components, number) for t in types for u in uris for s in suites)
+    return entries, errors
+
+
+# Mirror probing
+class HttpPool:
+    """Small keep-alive connection pool for HEAD requests, shared between threads.
+
+    ``base_url`` replaces the scheme and host of every probed URL so a local
+    stand-in server can answer instead of the real mirrors.
+    """
+
+    def __init__(self, base_url=None, size=POOL_SIZE, timeout=PROBE_TIMEOUT):
+        self.base_url = urlsplit(base_url) if base_url else None
+        self.size = size
+        self.timeout = timeout
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _rewrite(self, url):
+        parts = urlsplit(url)
+        if self.base_url:
+            path = self.base_url.path.rstrip("/") + parts.path
+            parts = parts._replace(scheme=self.base_url.scheme, netloc=self.base_url.netloc, path=path)
+        return parts
+
+    def _pool(self, scheme, netloc):
+        with self._lock:
+            return self._pools.setdefault((scheme, netloc), queue.LifoQueue(self.size))
+
+    def _connect(self, parts):
+        cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        return cls(parts.netloc, timeout=self.timeout)
+
+    def head(self, url):
+        """Return the HTTP status of ``url``, or None for non-HTTP URLs and connection errors."""
+        parts = self._rewrite(url)
+        if parts.scheme not in ("http", "https"):
+            return None
+        pool = self._pool(parts.scheme, parts.netloc)
+        try:
+            connection, reused = pool.get_nowait(), True
+        except queue.Empty:
+            connection, reused = self._connect(parts), False
+        path = urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        while True:
+            try:
+                connection.request("HEAD", path)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                break
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                if not reused:
+                    return None
+                # The server may have closed a kept-alive connection; try once more on a new one
+                connection, reused = self._connect(parts), False
+        try:
+            pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+        return status
+
+    def close(self):
+        with self._lock:
+            for pool in self._pools.values():
+                while not pool.empty():
+                    pool.get_nowait().close()
+            self._pools.clear()
+
+
+def probe_entry(entry, pool):
+    """Return None if the entry's Release file is reachable (or not over HTTP), otherwise a short error."""
+    if urlsplit(entry.uri).scheme not in ("http", "https"):
+        return None
+    statuses = []
+    for url in entry.release_urls():
+        status = pool.head(url)
+        if status == 200:
+            return None
+        statuses.append(f"{url} -> {status or 'unreachable'}")
+    return "; ".join(statuses)
+
+
+# Validation
+def _load_cache(cache_file):
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_file, cache):
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp = f"{cache_file}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
+
+
+def validate_file(path, cached=None):
+    """Validate one file, reusing ``cached`` (a previous report dict) if its content hash still matches."""
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if cached and cached.get("sha256") == digest:
+        entries = [SourceEntry(e["type"], e["uri"], e["suite"], e["components"], e["line"]) for e in cached["entries"]]
+        return SourceReport(path, digest, entries, [tuple(error) for error in cached["errors"]], cached=True)
+    text = data.decode("utf-8", errors="replace")
+    parser = parse_deb822 if path.endswith(".sources") else parse_one_line
+    entries, errors = parser(text)
+    return SourceReport(path, digest, entries, errors)
+
+
+def validate_sources(directory=SOURCES_DIR, cache_file=CACHE_FILE, probe=False, base_url=None,
+                     max_workers=MAX_WORKERS):
+    """Validate every ``.list`` and ``.sources`` file in ``directory`` concurrently.
+
+    Files whose content hash matches the cache are not parsed again. With
+    ``probe`` enabled, each entry's Release file is checked over a pooled HTTP
+    client and failures are recorded in ``report.unreachable``.
+    """
+    cache = _load_cache(cache_file) if cache_file else {}
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                   if name.endswith((".list", ".sources")))
+
+    def check(path):
+        try:
+            return validate_file(path, cache.get(path))
+        except OSError as e:
+            return SourceReport(path, None, read_error=str(e))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        reports = list(executor.map(check, paths))
+
+        if cache_file:
+            _save_cache(cache_file, {
+                report.path: {"sha256": report.digest, "entries": [e.to_dict() for e in report.entries],
+                              "errors": report.errors}
+                for report in reports if report.digest
+            })
+
+        if probe:
+            pool = HttpPool(base_url)
+            try:
+                pending = [(report, entry) for report in reports if report.valid for entry in report.entries]
+                for (report, entry), error in zip(pending, executor.map(lambda item: probe_entry(item[1], pool), pending)):
+                    if error:
+                        report.unreachable.append((entry.line, error))
+            finally:
+                pool.close()
+    return reports
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# By https://github.com/kvnbbg
+"""Local wheel cache: resolve requirements once, fetch wheels in parallel, install offline."""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from .dependencies import REQUIREMENTS_FILE
+    from .executor import null_sink, run_command
+except ImportError:
+    from dependencies import REQUIREMENTS_FILE
+    from executor import null_sink, run_command
+
+WHEELHOUSE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ubuntuboost", "wheelhouse")
+MAX_DOWNLOADS = 8         # Wheels fetched (or built from sdists) at the same time
+PIP_TIMEOUT = 1800        # Wall-clock limit for one pip command, in seconds
+CHUNK_SIZE = 1 << 20
+
+
+class WheelhouseError(Exception):
+    """Resolving, fetching or installing from the wheelhouse failed."""
+
+
+def _file_sha256(path):
+    """Return the hex SHA-256 of the file at ``path``."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _pip(python, *args, timeout=PIP_TIMEOUT):
+    result = run_command([python, "-m", "pip", *args], timeout=timeout, sink=null_sink)
+    if not result.ok:
+        raise WheelhouseError(f"pip {args[0]} failed: {' '.join(result.stderr[-3:]) or result.returncode}")
+    return result
+
+
+class Wheelhouse:
+    """Content-addressed wheel store plus a lock file per resolved requirement set.
+
+    ``objects/<sha256>.whl`` holds every wheel under its content hash,
+    ``links/`` has hard links to them under their wheel filenames (the
+    directory pip reads with ``--find-links``), and ``locks/<key>.txt`` pins
+    the full resolved set of one requirements file and interpreter, with hashes.
+    """
+
+    def __init__(self, root=WHEELHOUSE_DIR):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.links = os.path.join(root, "links")
+        self.locks = os.path.join(root, "locks")
+        for path in (self.objects, self.links, self.locks):
+            os.makedirs(path, exist_ok=True)
+
+    def lock_path(self, requirements_path, python):
+        """Lock file for this requirements file and interpreter (version and platform)."""
+        result = run_command([python, "-c", "import sys, sysconfig; print(sys.version, sysconfig.get_platform())"],
+                             timeout=60, sink=null_sink)
+        if not result.ok:
+            raise WheelhouseError(f"cannot run {python}")
+        digest = hashlib.sha256(result.output.encode())
+        with open(requirements_path, "rb") as f:
+            digest.update(f.read())
+        return os.path.join(self.locks, f"{digest.hexdigest()[:32]}.txt")
+
+    def resolve(self, requirements_path, python):
+        """Let pip resolve the full pin set once, without downloading; return ``[(name, version, url, sha256)]``."""
+        with tempfile.TemporaryDirectory() as tmp:
+            report = os.path.join(tmp, "report.json")
+            _pip(python, "install", "--dry-run", "--ignore-installed", "--quiet", "--report", report,
+                 "-r", requirements_path)
+            with open(report) as f:
+                items = json.load(f)["install"]
+        return [(item["metadata"]["name"], item["metadata"]["version"], item["download_info"]["url"],
+                 item["download_info"].get("archive_info", {}).get("hashes", {}).get("sha256"))
+                for item in items]
+
+    def _link(self, sha256, filename):
+        """Make ``links/<filename>`` point at the stored object, replacing a missing or stale link."""
+        obj = os.path.join(self.objects, f"{sha256}.whl")
+        link = os.path.join(self.links, filename)
+        if self._linked(obj, link):
+            return
+        if os.path.lexists(link):
+            os.remove(link)
+        try:
+            os.link(obj, link)
+        except OSError:
+            shutil.copy(obj, link)
+
+    @staticmethod
+    def _linked(obj, link):
+        """True if ``link`` is ``obj`` itself, or a copy of it (objects are named after their hash)."""
+        try:
+            return os.path.samefile(obj, link) or _file_sha256(link) == os.path.basename(obj)[:-len(".whl")]
+        except OSError:
+            return False
+
+    def _store(self, path, sha256=None):
+        """Move a wheel into the object store (verifying ``sha256`` if given) and link it by name."""
+        digest = _file_sha256(path)
+        if sha256 and digest != sha256:
+            raise WheelhouseError(f"{os.path.basename(path)}: hash mismatch")
+        os.replace(path, os.path.join(self.objects, f"{digest}.whl"))
+        self._link(digest, os.path.basename(path))
+        return digest, os.path.basename(path)
+
+    def fetch(self, name, version, url, sha256, python):
+        """Make one resolved package available as a wheel; return its wheel ``(sha256, filename)``."""
+        filename = os.path.basename(url.split("#", 1)[0])
+        if sha256 and filename.endswith(".whl") and os.path.exists(os.path.join(self.objects, f"{sha256}.whl")):
+            self._link(sha256, filename)
+            return sha256, filename
+        with tempfile.TemporaryDirectory(dir=self.root) as tmp:
+            if filename.endswith(".whl"):
+                path = os.path.join(tmp, filename)
+                with urllib.request.urlopen(url, timeout=PIP_TIMEOUT) as response, open(path, "wb") as f:
+                    shutil.copyfileobj(response, f, CHUNK_SIZE)
+                return self._store(path, sha256)
+            # sdist: build it once; the lock then pins the hash of the built wheel
+            _pip(python, "wheel", "--no-deps", "--quiet", "--wheel-dir", tmp, f"{name}=={version}")
+            built = glob.glob(os.path.join(tmp, "*.whl"))
+            if not built:
+                raise WheelhouseError(f"building {name}=={version} produced no wheel")
+            return self._store(built[0])
+
+    def fill(self, requirements_path=REQUIREMENTS_FILE, python=sys.executable, max_workers=MAX_DOWNLOADS):
+        """Resolve, fetch every wheel in parallel and write the lock file; return its path."""
+        resolved = self.resolve(requirements_path, python)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            wheels = list(pool.map(lambda item: self.fetch(*item, python), resolved))
+        lock = self.lock_path(requirements_path, python)
+        tmp = f"{lock}.tmp"
+        with open(tmp, "w") as f:
+            for (name, version, _, _), (sha256, filename) in zip(resolved, wheels):
+                # The trailing comment names the link pip will look for; pip ignores it
+                f.write(f"{name}=={version} --hash=sha256:{sha256}  # {filename}\n")
+        os.replace(tmp, lock)
+        return lock
+
+    def is_complete(self, lock):
+        """True if ``lock`` exists and every wheel it pins is stored and linked under its filename."""
+        try:
+            with open(lock) as f:
+                pins = [line.rsplit("sha256:", 1)[1].split("#", 1) for line in f if "sha256:" in line]
+        except OSError:
+            return False
+        if any(len(pin) != 2 for pin in pins):
+            return False  # Lock written before filenames were recorded
+        return all(self._linked(os.path.join(self.objects, f"{sha256.strip()}.whl"),
+                                os.path.join(self.links, filename.strip()))
+                   for sha256, filename in pins)
+
+    def install(self, requirements_path=REQUIREMENTS_FILE, python=sys.executable, max_workers=MAX_DOWNLOADS):
+        """Install requirements into ``python``'s environment from the wheelhouse, filling it first if needed.
+
+        Once the lock is complete no network is used at all.
+        """
+        lock = self.lock_path(requirements_path, python)
+        if not self.is_complete(lock):
+            lock = self.fill(requirements_path, python, max_workers)
+        return _pip(python, "install", "--no-index", "--find-links", self.links, "--require-hashes", "-r", lock)
@@ -0,0 +1,58 @@
+import json
+import unittest
+from unittest import mock
+
+from click.testing import CliRunner
+
+from src import cli, optimizer
+
+
+def events(output):
+    return [json.loads(line) for line in output.splitlines()]
+
+
+class CliTest(unittest.TestCase):
+    def invoke(self, *args):
+        return CliRunner().invoke(cli.cli, list(args))
+
+    def test_change_needs_confirmation(self):
+        result = self.invoke("swap")
+        self.assertEqual(result.exit_code, cli.EXIT_NOT_CONFIRMED)
+        self.assertEqual(events(result.output)[-1]["exit_code"], cli.EXIT_NOT_CONFIRMED)
+
+    def test_group_options_accepted_after_subcommand(self):
+        with mock.patch.object(cli, "_check_host", return_value="not here"):
+            for args in (("--yes", "swap"), ("swap", "--yes"), ("swap", "-y", "--no-command-output")):
+                result = self.invoke(*args)
+                self.assertEqual(result.exit_code, cli.EXIT_UNSUPPORTED, args)
+
+    def test_failing_body_still_ends_the_stream(self):
+        with mock.patch.object(optimizer, "build_plan", side_effect=RuntimeError("no apt lists")):
+            result = self.invoke("plan")
+        stream = events(result.output)
+        self.assertEqual(result.exit_code, cli.EXIT_FAILED)
+        self.assertEqual(stream[-2]["message"], "RuntimeError: no apt lists")
+        self.assertEqual(stream[-1]["event"], "end")
+        self.assertEqual(stream[-1]["exit_code"], cli.EXIT_FAILED)
+
+    def test_nothing_to_roll_back_succeeds(self):
+        with mock.patch.object(cli, "_check_host", return_value=None), \
+                mock.patch.object(cli.LocalBackend, "rollback_profile", return_value=False):
+            result = self.invoke("profile-rollback", "--yes")
+        self.assertEqual(result.exit_code, cli.EXIT_OK)
+        self.assertIn("No applied profile to roll back.", [event.get("message") for event in events(result.output)])
+
+    def test_mirror_options_reach_source_validation(self):
+        seen = {}
+
+        def build_plan():
+            seen.update(probe=optimizer.PROBE_MIRRORS, base_url=optimizer.MIRROR_BASE_URL)
+            return {}
+        with mock.patch.multiple(optimizer, PROBE_MIRRORS=False, MIRROR_BASE_URL=None, build_plan=build_plan):
+            result = self.invoke("plan", "--probe-mirrors", "--mirror-base-url", "http://127.0.0.1:8080")
+        self.assertEqual(result.exit_code, cli.EXIT_OK)
+        self.assertEqual(seen, {"probe": True, "base_url": "http://127.0.0.1:8080"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+from src.dependencies import Requirement
+
+
+class RequirementTest(unittest.TestCase):
+    def check(self, op, version, installed):
+        return Requirement("example", op, version).satisfied_by(installed)
+
+    def test_compatible_release_keeps_written_prefix(self):
+        self.assertTrue(self.check("~=", "2.0", "2.5"))
+        self.assertFalse(self.check("~=", "2.0", "3.1"))
+        self.assertFalse(self.check("~=", "2.0", "1.9"))
+        self.assertTrue(self.check("~=", "1.4.0", "1.4.7"))
+        self.assertFalse(self.check("~=", "1.4.0", "1.5"))
+        self.assertTrue(self.check("~=", "2.2", "2.10"))
+
+    def test_equality_ignores_trailing_zeros(self):
+        self.assertTrue(self.check("==", "1.23", "1.23.0"))
+        self.assertFalse(self.check("==", "1.23.2", "1.23.3"))
+        self.assertTrue(self.check(">=", "1.9", "1.10"))
+
+
+if __name__ == "__main__":
+    unittest.main()
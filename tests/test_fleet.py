@@ -0,0 +1,110 @@
+import os
+import stat
+import tempfile
+import unittest
+
+from src.fleet import FLEET_REQUIREMENTS, Fleet, build_report, load_inventory, write_fleet_requirements
+
+# Stand-ins for ssh and scp: every host is a directory under $FLEET_HOSTS acting as its home,
+# and the host named "dead" refuses connections the way ssh reports them.
+SSH = """#!/bin/sh
+while [ $# -gt 0 ]; do case "$1" in -o) shift 2;; -O) exit 0;; *) break;; esac; done
+HOST="$1"; shift
+[ "$HOST" = dead ] && { echo "ssh: connect to host dead: Connection refused" >&2; exit 255; }
+mkdir -p "$FLEET_HOSTS/$HOST" && cd "$FLEET_HOSTS/$HOST" && HOST="$HOST" exec sh -c "$*"
+"""
+SCP = """#!/bin/sh
+while [ $# -gt 0 ]; do case "$1" in -o) shift 2;; -q|-r) shift;; *) break;; esac; done
+for last; do :; done
+while [ $# -gt 1 ]; do cp -r "$1" "$FLEET_HOSTS/${last%%:*}/${last#*:}"; shift; done
+"""
+# Plays src/cli.py: a banner line, then JSON events; hosts named bad* fail their task
+CLI = """#!/bin/sh
+task="$4"
+echo "Welcome to the test host"
+echo "{\\"event\\": \\"task_start\\", \\"task\\": \\"$task\\"}"
+case "$HOST" in bad*)
+  echo "{\\"event\\": \\"log\\", \\"level\\": \\"error\\", \\"message\\": \\"$task broke\\"}"
+  echo "{\\"event\\": \\"task_end\\", \\"task\\": \\"$task\\", \\"ok\\": false, \\"duration\\": 0.1}"
+  exit 1;;
+esac
+echo "{\\"event\\": \\"task_end\\", \\"task\\": \\"$task\\", \\"ok\\": true, \\"duration\\": 0.1}"
+"""
+
+
+class FleetTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.hosts_dir = os.path.join(self.tmp.name, "hosts")
+        os.mkdir(self.hosts_dir)
+        os.environ["FLEET_HOSTS"] = self.hosts_dir
+        self.ssh, self.scp, self.cli = (self.script(name, body) for name, body in
+                                        (("ssh", SSH), ("scp", SCP), ("cli", CLI)))
+
+    def tearDown(self):
+        os.environ.pop("FLEET_HOSTS", None)
+        self.tmp.cleanup()
+
+    def script(self, name, body):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(body)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def fleet(self, hosts, **kwargs):
+        options = dict(ssh=self.ssh, scp=self.scp, python=self.cli, use_env=False, sudo=False,
+                       control_dir=os.path.join(self.tmp.name, "control"), timeout=30)
+        options.update(kwargs)
+        return Fleet(hosts, **options)
+
+    def test_results_and_report(self):
+        fleet = self.fleet(["h1", "bad1", "dead", "h2"], tasks=["optimize", "swap"], concurrency=2, max_failure_rate=1)
+        results = {result.host: result for result in fleet.run()}
+        self.assertEqual(results["h1"].status, "ok")
+        self.assertEqual(set(results["h1"].tasks), {"optimize", "swap"})
+        self.assertEqual(results["bad1"].status, "failed")
+        self.assertEqual(results["bad1"].exit_code, 1)
+        self.assertEqual(list(results["bad1"].tasks), ["optimize"])   # The pipeline stops at the first failure
+        self.assertEqual(results["bad1"].errors, ["optimize broke"])
+        self.assertEqual(results["dead"].status, "unreachable")
+
+        report = build_report(fleet, list(results.values()), 1.0)
+        self.assertEqual(report["counts"], {"ok": 2, "failed": 1, "unreachable": 1})
+        self.assertEqual(report["failure_rate"], 0.5)
+        self.assertEqual(report["task_duration"]["swap"]["hosts"], 2)
+
+    def test_circuit_breaker_skips_later_batches(self):
+        fleet = self.fleet(["bad1", "h1", "h2", "h3", "h4", "h5"], batch_size=2, max_failure_rate=0.25)
+        results = fleet.run()
+        self.assertEqual(fleet.tripped_after, 1)
+        self.assertEqual([result.status for result in results], ["failed", "ok"] + ["skipped"] * 4)
+
+    def test_sync_copies_cli_and_fleet_requirements(self):
+        fleet = self.fleet(["h1"], tasks=["swap"], sync=True)
+        self.assertEqual(fleet.run()[0].status, "ok")
+        remote = os.path.join(self.hosts_dir, "h1", fleet.remote_dir)
+        self.assertTrue(os.path.exists(os.path.join(remote, "src", "cli.py")))
+        with open(os.path.join(remote, FLEET_REQUIREMENTS)) as f:
+            self.assertEqual(sorted(line.split("==")[0] for line in f), ["click", "numpy"])
+
+    def test_remote_command_uses_environment_and_quotes(self):
+        fleet = Fleet(["h1"], remote_dir="my boost")
+        self.assertEqual(fleet.remote_command("profile-apply database"),
+                         "sudo -n 'my boost/.venv/bin/python' 'my boost/src/cli.py' --yes --no-command-output "
+                         "profile-apply database")
+
+    def test_inventory_skips_comments_and_duplicates(self):
+        path = os.path.join(self.tmp.name, "hosts.txt")
+        with open(path, "w") as f:
+            f.write("web1\n\n# staging\nadmin@web2  # db replica\nweb1\n")
+        self.assertEqual(load_inventory(path), ["web1", "admin@web2"])
+
+    def test_fleet_requirements_follow_requirements_txt(self):
+        path = write_fleet_requirements(os.path.join(self.tmp.name, FLEET_REQUIREMENTS))
+        with open(path) as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from src.profiles import SNAPSHOT_FILE, SYSCTL_CONF, ProfileEngine, ProfileError
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+class ProfileEngineTest(unittest.TestCase):
+    """Profiles applied to a fake /proc/sys and /sys tree."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.engine = ProfileEngine(self.root)
+        self.original = {"vm.swappiness": "60", "vm.vfs_cache_pressure": "100", "vm.dirty_ratio": "20"}
+        for key, value in self.original.items():
+            write(self.engine.sysctl_path(key), f"{value}\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def value(self, key):
+        return read(self.engine.sysctl_path(key)).strip()
+
+    def test_apply_writes_verifies_and_persists(self):
+        settings, skipped = self.engine.apply({"sysctl": {"vm.swappiness": 10, "vm.nonexistent": 1}})
+        self.assertEqual(self.value("vm.swappiness"), "10")
+        self.assertEqual(skipped, ["vm.nonexistent"])
+        self.assertIn("vm.swappiness = 10", read(os.path.join(self.root, SYSCTL_CONF)))
+
+    def test_rollback_after_two_applies_restores_original_values(self):
+        self.engine.apply({"sysctl": {"vm.swappiness": 10}})
+        self.engine.apply({"sysctl": {"vm.swappiness": 1, "vm.dirty_ratio": 15}})
+        self.assertTrue(self.engine.rollback())
+        for key, value in self.original.items():
+            self.assertEqual(self.value(key), value)
+        self.assertFalse(os.path.exists(os.path.join(self.root, SYSCTL_CONF)))
+        self.assertFalse(os.path.exists(os.path.join(self.root, SNAPSHOT_FILE)))
+        self.assertFalse(self.engine.rollback())
+
+    def test_failed_verification_rolls_back(self):
+        original_verify = self.engine.verify
+        self.engine.verify = lambda settings: {path: ("10", "60") for path in settings}
+        with self.assertRaises(ProfileError):
+            self.engine.apply({"sysctl": {"vm.swappiness": 10, "vm.dirty_ratio": 5}})
+        self.engine.verify = original_verify
+        self.assertEqual(self.value("vm.swappiness"), "60")
+        self.assertEqual(self.value("vm.dirty_ratio"), "20")
+        self.assertFalse(os.path.exists(os.path.join(self.root, SNAPSHOT_FILE)))
+
+    def test_unreadable_setting_raises_profile_error(self):
+        path = self.engine.sysctl_path("vm.swappiness")
+        os.remove(path)
+        os.mkdir(path)
+        with self.assertRaises(ProfileError):
+            self.engine.apply({"sysctl": {"vm.swappiness": 10}})
+
+    def test_selector_files_compare_by_selected_entry(self):
+        scheduler = os.path.join(self.root, "sys/block/sda/queue/scheduler")
+        write(scheduler, "[mq-deadline] none bfq\n")
+        engine = self.engine
+        original_write = engine.write
+
+        def kernel_write(settings):
+            # The kernel shows the selection in brackets when the file is read back
+            errors = original_write(settings)
+            if scheduler in settings:
+                write(scheduler, "mq-deadline none [bfq]\n")
+            return errors
+
+        engine.write = kernel_write
+        settings, _ = engine.apply({"io_scheduler": "bfq"}, persist=False)
+        self.assertEqual(settings[scheduler], "bfq")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.sources import HttpPool, validate_sources
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = 0.2   # Idle kept-alive connections are dropped without notice, like a busy mirror
+
+    def do_HEAD(self):
+        self.send_response(200 if self.path.endswith("Release") else 404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.pool = HttpPool(f"http://127.0.0.1:{self.server.server_port}")
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_stale_keep_alive_connection_is_reopened(self):
+        url = "http://archive.ubuntu.com/ubuntu/dists/jammy/InRelease"
+        self.assertEqual(self.pool.head(url), 200)
+        time.sleep(0.5)
+        self.assertEqual(self.pool.head(url), 200)
+
+    def test_status_is_reported(self):
+        self.assertEqual(self.pool.head("http://archive.ubuntu.com/missing"), 404)
+        self.assertIsNone(HttpPool().head("file:///srv/mirror/dists/jammy/InRelease"))
+
+
+class ValidateSourcesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.dir, name), "w") as f:
+            f.write(content)
+
+    def test_malformed_and_unreadable_files_are_told_apart(self):
+        self.write("good.list", "deb http://archive.ubuntu.com/ubuntu jammy main\n")
+        self.write("bad.list", "deb jammy\n")
+        os.mkdir(os.path.join(self.dir, "unreadable.list"))
+        reports = {os.path.basename(r.path): r for r in validate_sources(self.dir, cache_file=None)}
+        self.assertTrue(reports["good.list"].valid)
+        self.assertTrue(reports["bad.list"].errors)
+        self.assertIsNone(reports["bad.list"].read_error)
+        self.assertFalse(reports["unreadable.list"].errors)
+        self.assertIsNotNone(reports["unreadable.list"].read_error)
+
+
+if __name__ == "__main__":
+    unittest.main()
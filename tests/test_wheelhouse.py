@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from src.wheelhouse import Wheelhouse
+
+
+class WheelhouseTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.house = Wheelhouse(os.path.join(self.tmp.name, "wheelhouse"))
+        wheel = os.path.join(self.tmp.name, "example-1.0-py3-none-any.whl")
+        with open(wheel, "wb") as f:
+            f.write(b"not really a zip")
+        self.sha256, self.filename = self.house._store(wheel)
+        self.lock = os.path.join(self.house.locks, "lock.txt")
+        with open(self.lock, "w") as f:
+            f.write(f"example==1.0 --hash=sha256:{self.sha256}  # {self.filename}\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_complete_when_stored_and_linked(self):
+        self.assertTrue(self.house.is_complete(self.lock))
+
+    def test_missing_link_is_incomplete_and_relinked_by_fetch(self):
+        os.remove(os.path.join(self.house.links, self.filename))
+        self.assertFalse(self.house.is_complete(self.lock))
+        url = f"https://files.example/{self.filename}"
+        self.assertEqual(self.house.fetch("example", "1.0", url, self.sha256, None), (self.sha256, self.filename))
+        self.assertTrue(self.house.is_complete(self.lock))
+
+    def test_dangling_link_is_incomplete(self):
+        link = os.path.join(self.house.links, self.filename)
+        os.remove(link)
+        os.symlink(os.path.join(self.house.objects, "gone.whl"), link)
+        self.assertFalse(self.house.is_complete(self.lock))
+
+    def test_copied_link_must_match_the_stored_wheel(self):
+        link = os.path.join(self.house.links, self.filename)
+        os.remove(link)
+        with open(link, "wb") as f:
+            f.write(b"not really a zip")
+        self.assertTrue(self.house.is_complete(self.lock))
+        with open(link, "wb") as f:
+            f.write(b"not really a jar")   # Same size, other content
+        self.assertFalse(self.house.is_complete(self.lock))
+
+    def test_lock_without_filenames_is_incomplete(self):
+        with open(self.lock, "w") as f:
+            f.write(f"example==1.0 --hash=sha256:{self.sha256}\n")
+        self.assertFalse(self.house.is_complete(self.lock))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,24 +1,56 @@
+import argparse
+import bisect
+import json
+import resource
 import subprocess
 import os
 import platform
+import queue
 import sys
 import shutil
-import tkinter as tk
-from tkinter import messagebox, scrolledtext, ttk
-from threading import Thread
-import pygame
 import random
+import time
+from collections import deque
+from threading import Thread
+from src.lazy import lazy_import
+
+# Heavy modules load on first use, so the GUI never pays for pygame or NumPy and the game never pays for Tk
+tk = lazy_import("tkinter")
+pygame = lazy_import("pygame")
+np = lazy_import("numpy")
 
 # Constants for the game
 WIDTH, HEIGHT = 640, 480
 BLOCK_SIZE = 20
 MAX_HEALTH = 100
 ZOMBIE_SPAWN_RATE = 50
+MAX_ZOMBIES = 16384      # Zombie pool size; spawning pauses while the pool is full
+TICK_RATE = 10           # Simulation ticks per second; zombies and the player move one cell per tick
+TICK_SECONDS = 1 / TICK_RATE
+FRAME_RATE = 0           # Render frame cap; 0 renders as fast as the display allows
+MAX_FRAME_SECONDS = 0.25  # Longest frame the simulation catches up on, so a stall cannot snowball
+STATS_KEY = "K_F3"       # pygame key toggling the frame/tick statistics overlay
+STATS_WINDOW = 120       # Frames and ticks averaged by the overlay
+
+# Constants for the GUI log
+LOG_POLL_MS = 100        # How often the Tk loop drains queued output lines
+LOG_BATCH_LINES = 500    # Most lines inserted per drain, so a flood cannot stall the UI
+LOG_MAX_LINES = 5000     # Oldest lines are dropped from the output box past this
 
 # Initialize Pygame
-pygame.init()
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("UbuntuBoost Game - Fun Mode")
+screen = None  # Display surface, created by init_display()
+rng = random.Random()  # Every random decision in the game goes through this, so a seed replays a run
+
+def init_display(headless=False):
+    """Initialize pygame and open the game window; ``headless`` renders off-screen via SDL's dummy driver."""
+    global screen
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("UbuntuBoost Game - Fun Mode")
+    return screen
 
 # Colors
 WHITE = (255, 255, 255)
@@ -31,14 +63,208 @@ GRAY = (128, 128, 128)
 
 # Player Setup
 player_x, player_y = WIDTH // 2, HEIGHT // 2
+player_prev_x, player_prev_y = player_x, player_y  # Position at the previous tick, for interpolation
 player_health = MAX_HEALTH
 player_level = 1
 player_experience = 0
-player_blocks = []
 
 # Enemy Setup
-zombies = []
 zombie_types = ["Zombie", "Unbun"]
+ZOMBIE_HEALTH = (50, 100)  # Starting health, indexed by zombie type
+ZOMBIE_COLORS = [RED, BLUE]
+LASER_DAMAGE = 10
+
+# Entity Store
+class EntityStore:
+    """Struct-of-arrays storage: entity ``i`` is row ``i`` of ``x``, ``y``, ``health`` and ``kind``.
+
+    ``prev_x``/``prev_y`` hold the position at the previous tick so rendering
+    can interpolate. The store is a fixed pool: every slot is allocated up
+    front, the first ``count`` rows are live and the rest are free. Removal
+    moves the last live rows into the holes (swap-remove), so the live rows
+    stay contiguous and indices are not stable across removals.
+    """
+    FIELDS = ("x", "y", "prev_x", "prev_y", "health", "kind")
+
+    def __init__(self, capacity):
+        self.count = 0
+        self.version = 0  # Bumped whenever a position changes or an entity comes or goes
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.prev_x = np.zeros(capacity, dtype=np.int32)
+        self.prev_y = np.zeros(capacity, dtype=np.int32)
+        self.health = np.zeros(capacity, dtype=np.int32)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+
+    @property
+    def capacity(self):
+        return len(self.x)
+
+    @property
+    def full(self):
+        return self.count == len(self.x)
+
+    def add(self, x, y, kind=0, health=0):
+        """Take a free slot for a new entity; return its index, or None if the pool is full."""
+        if self.full:
+            return None
+        index = self.count
+        self.x[index], self.y[index] = x, y
+        self.prev_x[index], self.prev_y[index] = x, y
+        self.kind[index], self.health[index] = kind, health
+        self.count += 1
+        self.version += 1
+        return index
+
+    def remove_where(self, mask):
+        """Remove every live entity where ``mask`` is True in one batch; return how many went."""
+        dead = np.flatnonzero(mask)
+        if not len(dead):
+            return 0
+        new_count = self.count - len(dead)
+        holes = dead[dead < new_count]
+        movers = np.arange(new_count, self.count)[~mask[new_count:self.count]]
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            array[holes] = array[movers]
+        self.count = new_count
+        self.version += 1
+        return len(dead)
+
+    def clear(self):
+        self.count = 0
+        self.version += 1
+
+# Entity pools, allocated by create_world()
+zombies = None
+player_blocks = None
+
+# Spatial Hash
+GRID_WIDTH, GRID_HEIGHT = WIDTH // BLOCK_SIZE, HEIGHT // BLOCK_SIZE
+
+def cell_of(x, y):
+    return (x // BLOCK_SIZE, y // BLOCK_SIZE)
+
+class SpatialHash:
+    """Cell index over an ``EntityStore``, rebuilt in one vectorized pass when the store changes.
+
+    Entities are sorted by cell key (``cy * width + cx``), so a row of cells is
+    one contiguous slice found by binary search. Every zombie moves every
+    tick, so a batch rebuild is cheaper than moving entries one at a time.
+    """
+    def __init__(self, store, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.store = store
+        self.width = width
+        self.height = height
+        self.order = np.empty(0, dtype=np.intp)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.version = None
+
+    def sync(self):
+        if self.version == self.store.version:
+            return
+        n = self.store.count
+        keys = (self.store.y[:n] // BLOCK_SIZE).astype(np.int64) * self.width + self.store.x[:n] // BLOCK_SIZE
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+        self.version = self.store.version
+
+    def near(self, x, y, radius=1):
+        """Return store indices of entities within ``radius`` cells (Chebyshev distance) of the point."""
+        self.sync()
+        cx, cy = cell_of(x, y)
+        x0, x1 = max(cx - radius, 0), min(cx + radius, self.width - 1)
+        rows = []
+        for gy in range(max(cy - radius, 0), min(cy + radius, self.height - 1) + 1):
+            lo = np.searchsorted(self.keys, gy * self.width + x0, side="left")
+            hi = np.searchsorted(self.keys, gy * self.width + x1, side="right")
+            rows.append(self.order[lo:hi])
+        return np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+
+zombie_grid = None
+
+# Blocks never move, so they keep a plain occupancy bitmap of the cell grid (see create_world).
+blocked = None
+
+def place_block(x, y):
+    """Add a block at a pixel position unless its cell already holds one."""
+    cx, cy = cell_of(x, y)
+    if blocked[cy, cx]:
+        return False
+    player_blocks.add(x, y)
+    blocked[cy, cx] = True
+    return True
+
+# Flow Field
+NEIGHBOURS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1)]
+
+class FlowField:
+    """Shared BFS distance map towards the player over the cell grid.
+
+    Rebuilt only when the player's cell or the block layout changes. The
+    step for every cell lives in the ``step_x``/``step_y`` arrays, so all
+    zombies advance with one fancy-indexed lookup. Diagonal steps may not
+    cut past a block.
+    """
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        self.distance = np.full((height, width), -1, dtype=np.int32)
+        self.step_x = np.zeros((height, width), dtype=np.int32)
+        self.step_y = np.zeros((height, width), dtype=np.int32)
+        self.key = None
+
+    def _can_step(self, cx, cy, dx, dy, blocked):
+        nx, ny = cx + dx, cy + dy
+        if not (0 <= nx < self.width and 0 <= ny < self.height) or blocked[ny, nx]:
+            return False
+        return not (dx and dy and (blocked[cy, cx + dx] or blocked[cy + dy, cx]))
+
+    def update(self, target, blocked, version):
+        """Recompute towards ``target`` (a cell) if it or the block layout ``version`` changed."""
+        if self.key == (target, version):
+            return False
+        self.key = (target, version)
+        distance = [[-1] * self.width for _ in range(self.height)]
+        self.step_x.fill(0)
+        self.step_y.fill(0)
+        tx, ty = target
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            distance[ty][tx] = 0
+            frontier = deque([target])
+            while frontier:
+                cx, cy = frontier.popleft()
+                next_distance = distance[cy][cx] + 1
+                for dx, dy in NEIGHBOURS:
+                    nx, ny = cx + dx, cy + dy
+                    # Zombies will walk the reverse of this step, from (nx, ny) back to (cx, cy)
+                    if self._can_step(cx, cy, dx, dy, blocked) and distance[ny][nx] < 0:
+                        distance[ny][nx] = next_distance
+                        self.step_x[ny, nx], self.step_y[ny, nx] = -dx, -dy
+                        frontier.append((nx, ny))
+        self.distance[:] = distance
+        self._fill_unreached(distance, blocked)
+        return True
+
+    def _fill_unreached(self, distance, blocked):
+        """Cells the BFS never entered (e.g. a block built under a zombie) step to their best neighbour."""
+        for cy in range(self.height):
+            for cx in range(self.width):
+                if distance[cy][cx] >= 0:
+                    continue
+                best = None
+                for dx, dy in NEIGHBOURS:
+                    if self._can_step(cx, cy, dx, dy, blocked):
+                        d = distance[cy + dy][cx + dx]
+                        if d >= 0 and (best is None or d < best):
+                            best = d
+                            self.step_x[cy, cx], self.step_y[cy, cx] = dx, dy
+
+flow_field = None
+
+def update_flow_field():
+    """Rebuild the flow field if the player moved to another cell or blocks changed."""
+    flow_field.update(cell_of(player_x, player_y), blocked, player_blocks.version)
 
 # Utility Functions
 def print_status(message, emoji="📊"):
@@ -53,10 +279,15 @@ def run_install_py():
         print_status(f"Healing failed: {str(e)}", "❌")
 
 def ensure_virtualenv():
-    """Ensure the virtual environment is activated or set up."""
-    if not os.path.exists('venv'):
-        print_status("Setting up the virtual environment...", "🐍")
-        subprocess.check_call([sys.executable, '-m', 'venv', 'venv'])
+    """Create or update the shared virtual environment; it is reused as is while nothing changed."""
+    from src.environment import ensure_environment
+    from src.wheelhouse import WheelhouseError
+    try:
+        python, action = ensure_environment()
+        print_status(f"Virtual environment {action}: {python}", "🐍")
+    except (WheelhouseError, OSError) as e:
+        print_status(f"Failed to set up the virtual environment: {e}. Attempting healing...", "❌")
+        run_install_py()
 
 def check_system():
     """Check the operating system and return its name."""
@@ -64,14 +295,6 @@ def check_system():
     print_status(f"Operating system: {os_name}", "💻")
     return os_name
 
-def install_requirements():
-    """Install the required Python packages."""
-    try:
-        subprocess.check_call([sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt'])
-    except subprocess.CalledProcessError:
-        print_status("Failed to install requirements. Attempting healing...", "❌")
-        run_install_py()
-
 def mathematical_logic(value1, value2):
     """Example mathematical logic to resolve problems."""
     try:
@@ -85,14 +308,52 @@ def mathematical_logic(value1, value2):
 
 # Game Functions
 def spawn_zombie():
-    if random.randint(1, ZOMBIE_SPAWN_RATE) == 1:
-        x = random.choice(range(0, WIDTH, BLOCK_SIZE))
-        y = random.choice(range(0, HEIGHT, BLOCK_SIZE))
-        z_type = random.choice(zombie_types)
-        zombies.append(Zombie(x, y, z_type))
+    if zombies.full:
+        return
+    if rng.randint(1, ZOMBIE_SPAWN_RATE) == 1:
+        x = rng.choice(range(0, WIDTH, BLOCK_SIZE))
+        y = rng.choice(range(0, HEIGHT, BLOCK_SIZE))
+        kind = zombie_types.index(rng.choice(zombie_types))
+        cx, cy = cell_of(x, y)
+        if blocked[cy, cx]:
+            return
+        zombies.add(x, y, kind, ZOMBIE_HEALTH[kind])
+
+def move_zombies():
+    """Advance every zombie one cell along the flow field in a single vectorized update."""
+    n = zombies.count
+    if not n:
+        return
+    update_flow_field()
+    zombies.prev_x[:n] = zombies.x[:n]
+    zombies.prev_y[:n] = zombies.y[:n]
+    cx = zombies.x[:n] // BLOCK_SIZE
+    cy = zombies.y[:n] // BLOCK_SIZE
+    zombies.x[:n] += flow_field.step_x[cy, cx] * BLOCK_SIZE
+    zombies.y[:n] += flow_field.step_y[cy, cx] * BLOCK_SIZE
+    zombies.version += 1
+
+def despawn_dead_zombies():
+    """Drop every zombie out of health in one batch and award experience per kill."""
+    global player_experience, player_level
+    kills = zombies.remove_where(zombies.health[:zombies.count] <= 0)
+    for _ in range(kills):
+        player_experience += 10
+        if player_experience >= 100:
+            player_level += 1
+            player_experience = 0
+
+def fire_laser():
+    """Damage the zombies overlapping the player's square, as the laser always has."""
+    hit = zombie_grid.near(player_x, player_y)
+    hit = hit[(np.abs(zombies.x[hit] - player_x) < BLOCK_SIZE) & (np.abs(zombies.y[hit] - player_y) < BLOCK_SIZE)]
+    if len(hit):
+        zombies.health[hit] -= LASER_DAMAGE
+        despawn_dead_zombies()
 
 def handle_player_input(keys):
-    global player_x, player_y, player_health, player_experience
+    global player_x, player_y, player_prev_x, player_prev_y
+    player_prev_x, player_prev_y = player_x, player_y
     if keys[pygame.K_LEFT] and player_x > 0:
         player_x -= BLOCK_SIZE
     if keys[pygame.K_RIGHT] and player_x < WIDTH - BLOCK_SIZE:
@@ -102,78 +363,321 @@ def handle_player_input(keys):
     if keys[pygame.K_DOWN] and player_y < HEIGHT - BLOCK_SIZE:
         player_y += BLOCK_SIZE
     if keys[pygame.K_SPACE]:  # Place a block
-        player_blocks.append(Block(player_x, player_y))
+        place_block(player_x, player_y)
     if keys[pygame.K_LCTRL]:  # Shoot a laser
-        for zombie in zombies[:]:
-            if zombie.rect.colliderect(pygame.Rect(player_x, player_y, BLOCK_SIZE, BLOCK_SIZE)):
-                zombie.health -= 10
-                if zombie.health <= 0:
-                    zombies.remove(zombie)
-                    player_experience += 10
-                    if player_experience >= 100:
-                        player_level += 1
-                        player_experience = 0
-
-def draw_game():
-    screen.fill(GRAY)
-    for block in player_blocks:
-        block.draw()
-    pygame.draw.rect(screen, GREEN, (player_x, player_y, BLOCK_SIZE, BLOCK_SIZE))
-    for zombie in zombies:
-        zombie.move_towards_player()
-        zombie.draw()
-    health_text = pygame.font.SysFont(None, 24).render(f"Health: {player_health}", True, WHITE)
-    screen.blit(health_text, (10, 10))
-    level_text = pygame.font.SysFont(None, 24).render(f"Level: {player_level}", True, WHITE)
-    screen.blit(level_text, (10, 40))
-    pygame.display.flip()
-
-def main_game_loop():
-  
+        fire_laser()
+
+def create_world():
+    """Allocate the entity pools and grids; deferred so that importing this module does not load NumPy."""
+    global zombies, player_blocks, zombie_grid, blocked, flow_field
+    zombies = EntityStore(MAX_ZOMBIES)
+    player_blocks = EntityStore(GRID_WIDTH * GRID_HEIGHT)  # One block per cell at most
+    zombie_grid = SpatialHash(zombies)
+    blocked = np.zeros((GRID_HEIGHT, GRID_WIDTH), dtype=bool)
+    flow_field = FlowField()
+
+def reset_game(seed=None):
+    """Put the world back to its starting state and reseed the game RNG."""
+    global player_x, player_y, player_prev_x, player_prev_y
+    global player_health, player_level, player_experience, renderer
+    if zombies is None:
+        create_world()
+    rng.seed(seed)
+    player_x, player_y = WIDTH // 2, HEIGHT // 2
+    player_prev_x, player_prev_y = player_x, player_y
+    player_health = MAX_HEALTH
+    player_level = 1
+    player_experience = 0
+    zombies.clear()
+    player_blocks.clear()
+    blocked.fill(False)
+    renderer = None
+
+def update_game(keys):
+    """Advance the simulation by one fixed tick."""
+    handle_player_input(keys)
+    spawn_zombie()
+    move_zombies()
+
+class FrameStats:
+    """Rolling frame and tick timings for the statistics overlay."""
+    def __init__(self, window=STATS_WINDOW):
+        self.frames = deque(maxlen=window)
+        self.ticks = deque(maxlen=window)
+        self.visible = False
+
+    def add_frame(self, seconds):
+        self.frames.append(seconds)
+
+    def add_tick(self, seconds):
+        self.ticks.append(seconds)
+
+    def lines(self):
+        frame_ms = [seconds * 1000 for seconds in self.frames] or [0.0]
+        tick_ms = [seconds * 1000 for seconds in self.ticks] or [0.0]
+        fps = len(frame_ms) / (sum(frame_ms) / 1000) if sum(frame_ms) else 0.0
+        return [
+            f"FPS: {fps:.0f}",
+            f"Frame: {sum(frame_ms) / len(frame_ms):.2f} ms (max {max(frame_ms):.2f})",
+            f"Tick: {sum(tick_ms) / len(tick_ms):.2f} ms (max {max(tick_ms):.2f})",
+            f"Zombies: {zombies.count}  Blocks: {player_blocks.count}",
+        ]
+
+# Render Layer
+TEXT_CACHE_LIMIT = 256  # Rendered text surfaces kept before the cache starts over
+DIRTY_RECT_LIMIT = 400  # Past this many changed rects one full flip is cheaper than update(rects)
+
+_fonts = {}
+_text_surfaces = {}
+_tiles = {}
+
+def get_font(size):
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.SysFont(None, size)
+    return font
+
+def render_text(text, size=24, color=WHITE):
+    """Return a rendered text surface, reused for as long as the text stays the same."""
+    key = (text, size, color)
+    surface = _text_surfaces.get(key)
+    if surface is None:
+        if len(_text_surfaces) >= TEXT_CACHE_LIMIT:
+            _text_surfaces.clear()
+        surface = _text_surfaces[key] = get_font(size).render(text, True, color)
+    return surface
+
+def tile(color):
+    """Return a BLOCK_SIZE square pre-filled with ``color``, in the display's pixel format."""
+    surface = _tiles.get(color)
+    if surface is None:
+        surface = pygame.Surface((BLOCK_SIZE, BLOCK_SIZE)).convert()
+        surface.fill(color)
+        _tiles[color] = surface
+    return surface
+
+class Renderer:
+    """Draw frames onto a surface and push only the rectangles that changed.
+
+    Blocks are baked into a background surface, re-baked when a block is
+    placed. Each frame erases last frame's sprites from the background,
+    blits the new ones and hands both sets of rects to ``display.update``.
+    """
+    def __init__(self, surface):
+        self.surface = surface
+        self.background = None
+        self.background_version = None
+        self.dirty = []
+
+    def _bake_background(self):
+        self.background = pygame.Surface(self.surface.get_size()).convert()
+        self.background.fill(GRAY)
+        n = player_blocks.count
+        brown = tile(BROWN)
+        self.background.blits([(brown, (x, y)) for x, y in zip(player_blocks.x[:n].tolist(), player_blocks.y[:n].tolist())],
+                              doreturn=False)
+        self.background_version = player_blocks.version
+
+    def draw(self, alpha=1.0, stats=None):
+        full = self.background_version != player_blocks.version
+        if full:
+            self._bake_background()
+            self.surface.blit(self.background, (0, 0))
+        else:
+            self.surface.blits([(self.background, rect, rect) for rect in self.dirty], doreturn=False)
+
+        px = player_prev_x + (player_x - player_prev_x) * alpha
+        py = player_prev_y + (player_y - player_prev_y) * alpha
+        drawn = [self.surface.blit(tile(GREEN), (round(px), round(py)))]
+        n = zombies.count
+        xs = (zombies.prev_x[:n] + (zombies.x[:n] - zombies.prev_x[:n]) * alpha).round().astype(np.int32)
+        ys = (zombies.prev_y[:n] + (zombies.y[:n] - zombies.prev_y[:n]) * alpha).round().astype(np.int32)
+        # Zombies converge on the player and stack up; each position and type only needs one blit
+        sprites = np.unique(np.stack([xs, ys, zombies.kind[:n].astype(np.int32)]), axis=1)
+        zombie_tiles = [tile(color) for color in ZOMBIE_COLORS]
+        drawn.extend(self.surface.blits([(zombie_tiles[kind], (x, y)) for x, y, kind in sprites.T.tolist()]))
+        drawn.append(self.surface.blit(render_text(f"Health: {player_health}"), (10, 10)))
+        drawn.append(self.surface.blit(render_text(f"Level: {player_level}"), (10, 40)))
+        if stats and stats.visible:
+            # Values change every frame, so caching these surfaces would only churn the cache
+            font = get_font(20)
+            for row, line in enumerate(stats.lines()):
+                drawn.append(self.surface.blit(font.render(line, True, WHITE), (WIDTH - 230, 10 + row * 18)))
+
+        if full or len(drawn) + len(self.dirty) > DIRTY_RECT_LIMIT:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.dirty + drawn)
+        self.dirty = drawn
+
+renderer = None
+
+def draw_game(alpha=1.0, stats=None):
+    """Render the world ``alpha`` of the way from the previous tick to the current one."""
+    global renderer
+    if renderer is None:
+        renderer = Renderer(screen)
+    renderer.draw(alpha, stats)
+
+# Input Replay
+class HeldKeys:
+    """Stand-in for ``pygame.key.get_pressed()`` built from a set of key codes."""
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+class InputScript:
+    """Keys held per simulation tick, replayed instead of the keyboard.
+
+    Steps are ``[tick, ["K_LEFT", "K_SPACE"]]`` pairs; each set of keys stays
+    held until the next step.
+    """
+    def __init__(self, steps):
+        self.steps = sorted((int(tick), HeldKeys(getattr(pygame, name) for name in names)) for tick, names in steps)
+        self.ticks = [tick for tick, _ in self.steps]
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def keys_at(self, tick):
+        index = bisect.bisect_right(self.ticks, tick) - 1
+        return self.steps[index][1] if index >= 0 else HeldKeys()
+
+def main_game_loop(script=None):
+    """Fixed-timestep loop: simulate at TICK_RATE, render every frame in between.
+
+    With an ``InputScript`` the simulation reads its keys from the script.
+    """
+    if screen is None:
+        init_display()
+    if zombies is None:
+        reset_game()
+    clock = pygame.time.Clock()
+    stats = FrameStats()
+    accumulator = 0.0
+    tick = 0
     running = True
     while running:
-        keys = pygame.key.get_pressed()
-        handle_player_input(keys)
-        spawn_zombie()
-        draw_game()
+        frame_seconds = clock.tick(FRAME_RATE) / 1000
+        stats.add_frame(frame_seconds)
+        accumulator += min(frame_seconds, MAX_FRAME_SECONDS)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-
-        pygame.time.delay(100)
-
-# Block and Zombie Classes
-class Block:
-    def __init__(self, x, y):
-        self.rect = pygame.Rect(x, y, BLOCK_SIZE, BLOCK_SIZE)
-
-    def draw(self):
-        pygame.draw.rect(screen, BROWN, self.rect)
-
-class Zombie:
-    def __init__(self, x, y, z_type):
-        self.rect = pygame.Rect(x, y, BLOCK_SIZE, BLOCK_SIZE)
-        self.type = z_type
-        self.health = 50 if z_type == "Zombie" else 100
-
-    def move_towards_player(self):
-        if player_x > self.rect.x:
-            self.rect.x += BLOCK_SIZE
-        elif player_x < self.rect.x:
-            self.rect.x -= BLOCK_SIZE
-        if player_y > self.rect.y:
-            self.rect.y += BLOCK_SIZE
-        elif player_y < self.rect.y:
-            self.rect.y -= BLOCK_SIZE
-
-    def draw(self):
-        color = RED if self.type == "Zombie" else BLUE
-        pygame.draw.rect(screen, color, self.rect)
+            elif event.type == pygame.KEYDOWN and event.key == getattr(pygame, STATS_KEY):
+                stats.visible = not stats.visible
+
+        while accumulator >= TICK_SECONDS:
+            started = time.perf_counter()
+            update_game(script.keys_at(tick) if script else pygame.key.get_pressed())
+            stats.add_tick(time.perf_counter() - started)
+            accumulator -= TICK_SECONDS
+            tick += 1
+
+        draw_game(accumulator / TICK_SECONDS, stats)
+
+# Benchmark
+def populate(zombie_count, block_count):
+    """Scatter blocks and zombies over free cells using the game RNG."""
+    cells = [(cx, cy) for cy in range(GRID_HEIGHT) for cx in range(GRID_WIDTH)]
+    rng.shuffle(cells)
+    for cx, cy in cells[:block_count]:
+        place_block(cx * BLOCK_SIZE, cy * BLOCK_SIZE)
+    free = [(cx, cy) for cx, cy in cells[block_count:] if (cx, cy) != cell_of(player_x, player_y)]
+    for _ in range(min(zombie_count, zombies.capacity) if free else 0):
+        cx, cy = rng.choice(free)
+        kind = rng.randrange(len(zombie_types))
+        zombies.add(cx * BLOCK_SIZE, cy * BLOCK_SIZE, kind, ZOMBIE_HEALTH[kind])
+
+def benchmark_game(ticks=1000, zombie_count=1000, block_count=100, seed=0, script=None, render=True):
+    """Run ``ticks`` headless ticks from a seeded world and return timing and memory figures.
+
+    Each sample is one tick plus, if ``render``, one frame drawn at the tick.
+    """
+    if screen is None:
+        init_display(headless=True)
+    reset_game(seed)
+    populate(zombie_count, block_count)
+    zombie_count = zombies.count  # Capped at MAX_ZOMBIES
+    samples = np.empty(ticks)
+    started = time.perf_counter()
+    for tick in range(ticks):
+        begin = time.perf_counter()
+        update_game(script.keys_at(tick) if script else HeldKeys())
+        if render:
+            draw_game()
+        samples[tick] = time.perf_counter() - begin
+    elapsed = time.perf_counter() - started
+    return {
+        "ticks": ticks,
+        "seed": seed,
+        "zombies_start": zombie_count,
+        "zombies_end": int(zombies.count),
+        "blocks": int(player_blocks.count),
+        "ticks_per_sec": ticks / elapsed if elapsed else 0.0,
+        "p50_ms": float(np.percentile(samples, 50) * 1000) if ticks else 0.0,
+        "p99_ms": float(np.percentile(samples, 99) * 1000) if ticks else 0.0,
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "entity_bytes": sum(getattr(store, name).nbytes for store in (zombies, player_blocks)
+                            for name in EntityStore.FIELDS),
+    }
+
+def print_benchmark(report):
+    print_status(f"{report['ticks']} ticks, seed {report['seed']}, {report['zombies_start']} zombies "
+                 f"({report['zombies_end']} left), {report['blocks']} blocks", "🎮")
+    print_status(f"{report['ticks_per_sec']:.1f} ticks/sec, p50 {report['p50_ms']:.3f} ms, "
+                 f"p99 {report['p99_ms']:.3f} ms", "⏱️")
+    print_status(f"Peak RSS {report['max_rss_kib'] / 1024:.1f} MiB, entity arrays "
+                 f"{report['entity_bytes'] / 1024:.1f} KiB", "🧠")
 
 # GUI Functions
+class LogBridge:
+    """Carry output lines from worker threads to a Tk text widget.
+
+    Workers only ``put`` lines on a queue. The Tk main loop drains it in
+    batches on an ``after()`` timer, so the widget is only touched from the
+    thread that owns it, and trims the widget to ``max_lines``.
+    """
+    def __init__(self, widget, max_lines=LOG_MAX_LINES, interval=LOG_POLL_MS, batch=LOG_BATCH_LINES):
+        self.widget = widget
+        self.max_lines = max_lines
+        self.interval = interval
+        self.batch = batch
+        self.queue = queue.SimpleQueue()
+
+    def put(self, line):
+        self.queue.put(line)
+
+    def start(self):
+        self.widget.after(self.interval, self._drain)
+
+    def _drain(self):
+        lines = []
+        try:
+            while len(lines) < self.batch:
+                lines.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
+            self.widget.insert(tk.END, "\n".join(lines) + "\n")
+            # The text always ends with a newline, so the last line index is one past the real lines
+            excess = int(self.widget.index("end-1c").split(".")[0]) - 1 - self.max_lines
+            if excess > 0:
+                self.widget.delete("1.0", f"{excess + 1}.0")
+            self.widget.see(tk.END)
+        # Come straight back while a backlog remains, otherwise wait for the next poll
+        self.widget.after(1 if len(lines) == self.batch else self.interval, self._drain)
+
+log_bridge = None
+
 def create_gui():
-    global output_box, current_slide
+    global output_box, current_slide, log_bridge
+    from tkinter import scrolledtext, ttk
 
     # Initialize the root window
     root = tk.Tk()
@@ -233,6 +737,8 @@ def create_gui():
     tab_control.add(dev_tab, text="Developer Mode")
     output_box = scrolledtext.ScrolledText(dev_tab, wrap=tk.WORD, width=60, height=20)
     output_box.pack(pady=20)
+    log_bridge = LogBridge(output_box)
+    log_bridge.start()
     start_button = tk.Button(dev_tab, text="Start Advanced User (Developer Mode)", command=lambda: Thread(target=start_advanced_mode).start())
     start_button.pack(pady=20)
 
@@ -258,29 +764,57 @@ def run_script():
     """Run the main script within the virtual environment and display output in the GUI."""
     try:
         print_status("Running the script...", "🚀")
-        process = subprocess.Popen([os.path.join('venv', 'bin', 'python'), 'run.py'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        while True:
-            output = process.stdout.readline()
-            if process.poll() is not None and output == '':
-                break
-            if output:
-                gui_log(output.strip())
+        # stderr is merged into stdout so both reach the log in the order they were written
+        from src.environment import env_python
+        process = subprocess.Popen([env_python(), 'run.py'], stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, text=True, errors="replace")
+        for line in process.stdout:
+            gui_log(line.rstrip())
+        returncode = process.wait()
+        if returncode:
+            gui_log(f"❌ run.py exited with code {returncode}")
     except Exception as e:
         print_status(f"Failed to run the script: {str(e)}", "❌")
         run_install_py()
 
 def gui_log(message):
-    """Log messages to the GUI."""
-    output_box.insert(tk.END, message + '\n')
-    output_box.see(tk.END)
+    """Queue a message for the GUI output box; safe to call from any thread."""
+    if log_bridge:
+        log_bridge.put(message)
+    else:
+        print(message)
 
 def main():
     print_status("🔍 Checking system requirements...", "🔍")
     ensure_virtualenv()
     check_system()
-    install_requirements()
     create_gui()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="UbuntuBoost GUI and zombie game.")
+    parser.add_argument("--play", action="store_true", help="Play the game instead of opening the GUI")
+    parser.add_argument("--benchmark", action="store_true", help="Run the headless game benchmark and exit")
+    parser.add_argument("--headless", action="store_true", help="Render off-screen with SDL's dummy driver")
+    parser.add_argument("--seed", type=int, default=None, help="Seed the game RNG for a reproducible run")
+    parser.add_argument("--script", help="JSON input script to replay instead of the keyboard")
+    parser.add_argument("--ticks", type=int, default=1000, help="Benchmark: simulation ticks to run")
+    parser.add_argument("--zombies", type=int, default=1000, help="Benchmark: zombies at the start")
+    parser.add_argument("--blocks", type=int, default=100, help="Benchmark: blocks at the start")
+    parser.add_argument("--no-render", action="store_true", help="Benchmark: time the simulation only")
+    parser.add_argument("--json", action="store_true", help="Benchmark: print the report as JSON")
+    args = parser.parse_args()
+    script = InputScript.load(args.script) if args.script else None
+
+    if args.benchmark:
+        report = benchmark_game(args.ticks, args.zombies, args.blocks, args.seed or 0, script, not args.no_render)
+        if args.json:
+            print(json.dumps(report))
+        else:
+            print_benchmark(report)
+    elif args.play:
+        init_display(headless=args.headless)
+        reset_game(args.seed)
+        main_game_loop(script)
+    else:
+        main()
 